@@ -1,14 +1,23 @@
-from telegram import Update, ParseMode
+from telegram import Update, ParseMode, InlineKeyboardButton, InlineKeyboardMarkup
+import html
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-BOT_TOKEN = os.getenv("BOT_TOKEN")
+import threading
+from collections import OrderedDict
 from telegram.ext import (
     Updater, CommandHandler, MessageHandler, Filters,
-    ConversationHandler, CallbackContext
+    ConversationHandler, CallbackContext, CallbackQueryHandler
 )
-from db_operation import SQLiteHandler
+from db_operation import SQLiteHandler, ConnectionPool
+from alerts import drain_alerts
+
+DB_PATH = "candidates.db"
+WORKERS = 8       # dispatcher threads that run searches and page flips
+PAGE_SIZE = 10    # candidates per results message
+MAX_MESSAGE = 4096  # Telegram's message length limit
+SEARCH_LIMIT = 50  # ranked hits kept for paging
+RESULTS_KEPT = 1000  # result lists kept for paging, one per results message
+ALERT_INTERVAL = 2  # seconds between drains of the alert outbox
+ALERT_MESSAGES = 25  # messages per drain, one per chat: 12.5/s, under Telegram's ~30/s
 
 TECH, LOCATION, YOE = range(3)
 
@@ -18,6 +27,26 @@ TECH_LIST = [
 ]
 
 user_state = {}
+results = OrderedDict()  # (chat_id, message_id) -> candidate ids, LRU; page buttons look up their own message
+results_lock = threading.Lock()
+db_pool = None  # ConnectionPool, one read-only connection per worker thread; set up by main()
+alert_db = None  # writable SQLiteHandler for saved searches and the alert outbox; set up by main()
+alert_lock = threading.Lock()
+candidate_ranker = None
+index_lock = threading.Lock()
+
+
+def get_candidate_ranker() -> "CandidateRanker":
+    """Long-lived ranker over a bitmap index shared by all workers; picks up newly ingested candidates on each query."""
+    global candidate_ranker
+    with index_lock:
+        if candidate_ranker is None:
+            from candidate_index import CandidateIndex
+            from ranking import CandidateRanker
+
+            db = SQLiteHandler(db_pool.db_path, read_only=True, check_same_thread=False)
+            candidate_ranker = CandidateRanker(CandidateIndex(db))
+    return candidate_ranker
 
 def start(update: Update, context: CallbackContext) -> int:
     user_id = update.effective_user.id
@@ -56,7 +85,7 @@ def receive_location(update: Update, context: CallbackContext) -> int:
     else:
         user_state[user_id]["location"] = location
 
-    update.message.reply_text("🧠 Enter minimum years of experience (or type `skip`):")
+    update.message.reply_text("🧠 Enter desired years of experience (or type `skip`):")
     return YOE
 
 def receive_yoe(update: Update, context: CallbackContext) -> int:
@@ -76,34 +105,174 @@ def receive_yoe(update: Update, context: CallbackContext) -> int:
     techs = user_state[user_id]["techs"]
     location = user_state[user_id]["location"]
 
-    # DB Query
-    db = SQLiteHandler()
-    results = db.filter_candidates(
+    # Query and reply on a worker thread so the dispatcher keeps serving other users
+    context.dispatcher.run_async(run_search, update.message, user_id, techs, location, yoe)
+    return ConversationHandler.END
+
+
+def run_search(message, user_id, techs, location, yoe):
+    ranked = get_candidate_ranker().rank(
         techs=techs,
         locations=[location] if location else None,
-        min_yoe=yoe
+        yoe=yoe or None,
+        page_size=SEARCH_LIMIT
     )
+    ids = [candidate_id for _, candidate_id in ranked]
+
+    if not ids:
+        message.reply_text("😞 No matching candidates found. Send /subscribe to be alerted when one turns up.")
+        return
+
+    send_results(message, ids)
+    message.reply_text("🔔 Send /subscribe to get new candidates matching this search as they post.")
+
+
+def describe_search(techs, location, yoe) -> str:
+    return f"{', '.join(techs) or 'any tech'} | {location or 'anywhere'} | ≥{yoe or 0:g} yrs"
+
+
+def subscribe(update: Update, context: CallbackContext):
+    """/subscribe: save the last /start search and alert on new candidates matching it."""
+    state = user_state.get(update.effective_user.id, {})
+    if "yoe" not in state:
+        update.message.reply_text("🔎 Run /start to pick a search first, then /subscribe to it.")
+        return
+
+    with alert_lock:
+        alert_db.add_subscription(update.effective_chat.id, state["techs"], state["location"], state["yoe"])
+    search = describe_search(state["techs"], state["location"], state["yoe"])
+    update.message.reply_text(f"🔔 Saved: {search}\nYou'll get a message when new candidates match. /unsubscribe to stop.")
+
+
+def unsubscribe(update: Update, context: CallbackContext):
+    """/unsubscribe: drop all of this chat's saved searches."""
+    with alert_lock:
+        deleted = alert_db.delete_subscriptions(update.effective_chat.id)
+    update.message.reply_text(f"🔕 Removed {deleted} saved search(es)." if deleted else "You have no saved searches.")
+
+
+def list_alerts(update: Update, context: CallbackContext):
+    """/alerts: list this chat's saved searches."""
+    with alert_lock:
+        subscriptions = alert_db.get_subscriptions(update.effective_chat.id)
+    if not subscriptions:
+        update.message.reply_text("You have no saved searches. Run /start, then /subscribe.")
+        return
+    lines = [describe_search(s["techs"], s["location"], s["min_yoe"]) for s in subscriptions]
+    update.message.reply_text("🔔 Saved searches:\n" + "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1)))
+
 
+def send_alerts(context: CallbackContext):
+    """Job: drain the alert outbox filled by ingest runs, ALERT_MESSAGES messages per tick."""
+    def send(chat_id, candidates):
+        # Whole entries only: spill into a second message rather than cut one.
+        text = f"🔔 {len(candidates)} new candidate(s) match your saved search:\n\n"
+        for entry in map(format_candidate, candidates):
+            if len(text) + len(entry) + 1 > MAX_MESSAGE:
+                context.bot.send_message(chat_id, text, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
+                text = ""
+            text += entry + "\n"
+        context.bot.send_message(chat_id, text, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
+
+    with alert_lock:
+        drain_alerts(alert_db, send, max_messages=ALERT_MESSAGES, per_message=PAGE_SIZE)
+
+
+def search(update: Update, context: CallbackContext):
+    """/search <free text>: ranked full-text search over blurbs, stacks and locations."""
+    query = " ".join(context.args).strip()
+    if not query:
+        update.message.reply_text("🔎 Usage: /search distributed systems payments")
+        return
+
+    results = db_pool.get().search_text(query, limit=SEARCH_LIMIT)
     if not results:
         update.message.reply_text("😞 No matching candidates found.")
-        return ConversationHandler.END
+        return
 
-    # Format and send results
-    for i, candidate in enumerate(results[:10], 1):  # Limit to top 10
-        msg = f"👤 *{candidate['author']}* ({candidate['experience_years']} yrs)\n"
-        msg += f"📍 {candidate['location']} | 🧰 {', '.join(candidate['tech_stack'])}\n"
-        if candidate["cv_link"]:
-            msg += f"📄 [CV Link]({candidate['cv_link']})\n"
-        msg += f"📝 {candidate['blurb'][:150]}...\n"  # Limit blurb length
-        update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
+    send_results(update.message, [candidate.id for candidate in results])
 
-    db.close()
 
-    return ConversationHandler.END
+def send_results(message, ids):
+    """Reply with the first page of results and remember them for that message's page buttons."""
+    text, markup = render_page(ids, 0)
+    sent = message.reply_text(text, parse_mode=ParseMode.HTML, reply_markup=markup, disable_web_page_preview=True)
+    with results_lock:
+        results[(sent.chat_id, sent.message_id)] = ids
+        while len(results) > RESULTS_KEPT:
+            results.popitem(last=False)
+
+
+def show_page(update: Update, context: CallbackContext):
+    query = update.callback_query
+    query.answer()
+    page = int(query.data.split(":")[1])
+    with results_lock:
+        ids = results.get((query.message.chat_id, query.message.message_id))
+    if ids is None:
+        query.edit_message_text("⌛ These results have expired. Run /start or /search again.")
+        return
+    text, markup = render_page(ids, page)
+    query.edit_message_text(text, parse_mode=ParseMode.HTML, reply_markup=markup, disable_web_page_preview=True)
+
+
+def clip(text, limit: int) -> str:
+    """Shorten raw text before it is escaped, so no HTML entity gets cut."""
+    text = text or ""
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
 
+def format_candidate(candidate) -> str:
+    """One candidate as Telegram HTML; every Reddit-supplied field is escaped."""
+    e = html.escape
+    msg = f"👤 <b>{e(clip(candidate.author, 64))}</b> ({candidate.experience_years} yrs)\n"
+    msg += f"📍 {e(clip(candidate.location, 64))} | 🧰 {e(clip(', '.join(candidate.tech_stack), 200))}\n"
+    if candidate.cv_link and len(candidate.cv_link) <= 500:
+        msg += f'📄 <a href="{e(candidate.cv_link)}">CV Link</a>\n'
+    msg += f"📝 {e(clip(candidate.blurb, 150))}\n"
+    return msg
 
-def main():
-    updater = Updater(BOT_TOKEN, use_context=True)
+
+def join_entries(header: str, entries: list) -> str:
+    """Header plus as many whole entries as fit in one message."""
+    text = header
+    for shown, entry in enumerate(entries):
+        more = f"\n… {len(entries) - shown} more not shown"
+        if len(text) + len(entry) + 1 + len(more) > MAX_MESSAGE:
+            return text + more
+        text += ("\n" if shown else "") + entry
+    return text
+
+
+def render_page(ids, page: int):
+    """Format one page of a results list as a single HTML message."""
+    pages = max(1, (len(ids) + PAGE_SIZE - 1) // PAGE_SIZE)
+    page = min(max(page, 0), pages - 1)
+    candidates = db_pool.get().get_by_ids(ids[page * PAGE_SIZE:(page + 1) * PAGE_SIZE])
+
+    entries = [format_candidate(candidate) for candidate in candidates]
+    text = join_entries(f"🔎 {len(ids)} candidates — page {page + 1}/{pages}\n\n", entries)
+
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("◀ Prev", callback_data=f"page:{page - 1}"))
+    if page < pages - 1:
+        buttons.append(InlineKeyboardButton("Next ▶", callback_data=f"page:{page + 1}"))
+    return text, InlineKeyboardMarkup([buttons]) if buttons else None
+
+
+def main(db_path: str = DB_PATH, token: str = None):
+    """Run the bot until interrupted; the token defaults to BOT_TOKEN from the environment or .env."""
+    global db_pool, alert_db
+    if token is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        token = os.getenv("BOT_TOKEN")
+
+    alert_db = SQLiteHandler(db_path, check_same_thread=False)  # also makes sure the schema exists before read-only opens
+    db_pool = ConnectionPool(db_path)
+    updater = Updater(token, use_context=True, workers=WORKERS)
     dp = updater.dispatcher
 
     conv_handler = ConversationHandler(
@@ -117,8 +286,21 @@ def main():
     )
 
     dp.add_handler(conv_handler)
+    dp.add_handler(CommandHandler("search", search, run_async=True))
+    dp.add_handler(CallbackQueryHandler(show_page, pattern=r"^page:\d+$", run_async=True))
+    dp.add_handler(CommandHandler("subscribe", subscribe))
+    dp.add_handler(CommandHandler("unsubscribe", unsubscribe))
+    dp.add_handler(CommandHandler("alerts", list_alerts))
+    updater.job_queue.run_repeating(send_alerts, interval=ALERT_INTERVAL, first=ALERT_INTERVAL)
     updater.start_polling()
-    updater.idle()
+    try:
+        updater.idle()
+    finally:
+        # idle() returns after the updater stopped, so no worker is still using these.
+        db_pool.close()
+        alert_db.close()
+        if candidate_ranker is not None:
+            candidate_ranker.index.db.close()
 
 if __name__ == "__main__":
     main()
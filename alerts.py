@@ -0,0 +1,153 @@
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from candidate import Candidate
+from candidate_index import CandidateIndex
+from db_operation import SQLiteHandler
+from gazetteer import location_key
+
+MAX_ATTEMPTS = 5  # sends tried before an alert is given up on
+
+
+class SubscriptionIndex:
+    """
+    Inverted index from techs and locations to saved searches, for matching
+    newly ingested candidates against every subscription at once.
+
+    Subscriptions are numbered 0..n-1 and each key maps to a bitset of the
+    subscriptions it concerns, like CandidateIndex does for candidates:
+    `requires[tech]` (searches needing that tech), `located[location]`
+    (searches limited to it), `anywhere` (no location) and one "min_yoe at
+    most this" bitset per distinct min_yoe. A candidate matches
+
+        (anywhere | located[its location]) & yoe bitset for its experience
+        minus requires[t] for every subscribed tech t it doesn't list
+
+    so the cost per candidate depends on how many distinct techs and
+    locations are subscribed to, never on how many subscriptions there are.
+
+    Same semantics as filter_candidates: every tech (case-insensitive), the
+    location (by gazetteer.location_key), experience_years >= min_yoe;
+    unknown experience counts as 0.
+    """
+
+    def __init__(self, subscriptions: Iterable[dict] = ()):
+        self.subscriptions: List[dict] = []
+        self.requires: Dict[str, int] = {}
+        self.located: Dict[str, int] = {}
+        self.anywhere = 0
+        self.yoe_values: List[float] = []
+        self.yoe_upto: List[int] = []  # subscriptions with min_yoe <= yoe_values[i]
+        for subscription in subscriptions:
+            self.add(subscription)
+
+    @classmethod
+    def from_db(cls, db: SQLiteHandler) -> "SubscriptionIndex":
+        return cls(db.get_subscriptions())
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def add(self, subscription: dict):
+        """Index one subscription ({id, chat_id, techs, location, min_yoe})."""
+        bit = 1 << len(self.subscriptions)
+        self.subscriptions.append(subscription)
+
+        for tech in subscription.get("techs") or []:
+            key = tech.lower()
+            self.requires[key] = self.requires.get(key, 0) | bit
+
+        location = subscription.get("location")
+        if location:
+            key = location_key(location)
+            self.located[key] = self.located.get(key, 0) | bit
+        else:
+            self.anywhere |= bit
+
+        min_yoe = subscription.get("min_yoe") or 0.0
+        pos = bisect_right(self.yoe_values, min_yoe)
+        if not pos or self.yoe_values[pos - 1] != min_yoe:
+            # A new threshold starts with everyone at or below the one before it.
+            below = self.yoe_upto[pos - 1] if pos else 0
+            insort(self.yoe_values, min_yoe)
+            self.yoe_upto.insert(pos, below)
+            pos += 1
+        for i in range(pos - 1, len(self.yoe_upto)):
+            self.yoe_upto[i] |= bit
+
+    def match_bits(self, candidate: Candidate) -> int:
+        pos = bisect_right(self.yoe_values, candidate.experience_years or 0.0)
+        if not pos:
+            return 0
+        bits = self.yoe_upto[pos - 1]
+        bits &= self.anywhere | self.located.get(location_key(candidate.location), 0)
+        if not bits:
+            return 0
+
+        listed = {tech.lower() for tech in candidate.tech_stack}
+        for tech, requiring in self.requires.items():
+            if tech not in listed:
+                bits &= ~requiring
+                if not bits:
+                    return 0
+        return bits
+
+    def match(self, candidate: Candidate) -> List[dict]:
+        """Subscriptions the candidate satisfies."""
+        return [self.subscriptions[i] for i in CandidateIndex.bits_to_ids(self.match_bits(candidate))]
+
+    def match_many(self, candidates: Iterable[Candidate]) -> Iterator[tuple]:
+        """(subscription, candidate) for every match in a batch."""
+        for candidate in candidates:
+            for subscription in self.match(candidate):
+                yield subscription, candidate
+
+
+def queue_alerts(db: SQLiteHandler, candidate_ids: List[int], index: Optional[SubscriptionIndex] = None) -> int:
+    """
+    Match freshly inserted candidates against the saved searches (`index`,
+    else loaded from `db`) and add the hits to the alert outbox. Returns
+    the number of alerts queued.
+    """
+    index = SubscriptionIndex.from_db(db) if index is None else index
+    if not index or not candidate_ids:
+        return 0
+    matches = index.match_many(db.get_by_ids(candidate_ids))
+    return db.enqueue_alerts(
+        (subscription["chat_id"], candidate.id, subscription["id"]) for subscription, candidate in matches
+    )
+
+
+def drain_alerts(db: SQLiteHandler, send: Callable[[int, List[Candidate]], None],
+                 max_messages: int = 20, per_message: int = 10) -> int:
+    """
+    Send the oldest queued alerts: at most `max_messages` calls to
+    send(chat_id, candidates), one per chat with up to `per_message`
+    candidates each, for the chats that have waited longest. Called on a
+    timer, this caps sends at max_messages per tick overall and one per
+    tick per chat, and each send carries as many of a chat's alerts as it
+    can.
+
+    Alerts are marked sent once send() returns; when it raises, they stay
+    queued and are retried on later ticks, up to MAX_ATTEMPTS times.
+    Returns the number of messages sent.
+    """
+    by_chat = OrderedDict()
+    for alert_id, chat_id, candidate_id in db.pending_alerts(max_messages, per_message, MAX_ATTEMPTS):
+        by_chat.setdefault(chat_id, []).append((alert_id, candidate_id))
+
+    sent = 0
+    for chat_id, alerts in by_chat.items():
+        alert_ids = [alert_id for alert_id, _ in alerts]
+        candidates = db.get_by_ids([candidate_id for _, candidate_id in alerts])
+        try:
+            if candidates:  # candidates deleted since being queued are just dropped
+                send(chat_id, candidates)
+        except Exception as e:
+            print(f"⚠️ Could not send {len(alerts)} alert(s) to chat {chat_id}: {e}")
+            db.mark_alerts_failed(alert_ids)
+            continue
+        db.mark_alerts_sent(alert_ids)
+        sent += 1
+    return sent
@@ -0,0 +1,134 @@
+import argparse
+import json
+
+import numpy as np
+
+from export import require_pyarrow
+
+# Experience buckets for yoe_by_city: [0, 1), [1, 3), ... [12, inf).
+YOE_BINS = (0, 1, 3, 5, 8, 12)
+DICTIONARY_COLUMNS = ["location", "tech_stack.list.element"]
+
+
+class CandidateSnapshot:
+    """
+    The standard reports over a Parquet snapshot written by
+    export.export_snapshot, never the live database.
+
+    Each report loads only the columns it needs (memory-mapped), turns
+    strings into integer codes once (Arrow dictionary encoding) and then
+    counts with a single np.bincount over combined keys, so it costs a few
+    array passes rather than a Python loop over candidates.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pa, self.pq = require_pyarrow()
+        self.rows = self.pq.ParquetFile(path).metadata.num_rows
+
+    def _columns(self, *names):
+        # Have Parquet hand the string columns over still dictionary-encoded
+        # rather than decoding every value into a string first.
+        return self.pq.read_table(self.path, columns=list(names), memory_map=True,
+                                  read_dictionary=DICTIONARY_COLUMNS)
+
+    def _encode(self, array) -> tuple:
+        """(integer code per value, numpy array of distinct labels); nulls become ""."""
+        if not self.pa.types.is_dictionary(array.type):
+            array = array.dictionary_encode()
+        encoded = array.unify_dictionaries().combine_chunks()
+        labels = encoded.dictionary.to_numpy(zero_copy_only=False)
+        if encoded.null_count:
+            codes = encoded.indices.fill_null(len(labels)).to_numpy()
+            return codes, np.append(labels, "")
+        return encoded.indices.to_numpy(), labels
+
+    def _techs(self, table) -> tuple:
+        """(row of each tech mention, tech code per mention, tech labels)."""
+        pc = self.pa.compute
+        techs = table.column("tech_stack")
+        rows = pc.list_parent_indices(techs).to_numpy()
+        codes, labels = self._encode(pc.list_flatten(techs))
+        return rows, codes, labels
+
+    @staticmethod
+    def _top(counts: np.ndarray, top: int = None) -> np.ndarray:
+        """Indices of the `top` largest non-zero counts, largest first."""
+        order = np.argsort(-counts, kind="stable")
+        return order[counts[order] > 0][:top]
+
+    def _ranked(self, counts: np.ndarray, labels: np.ndarray, top: int = None) -> list:
+        return [(str(labels[i]), int(counts[i])) for i in self._top(counts, top)]
+
+    def tech_popularity(self, top: int = 20) -> list:
+        """[(tech, candidates listing it)], most popular first."""
+        _, codes, labels = self._techs(self._columns("tech_stack"))
+        return self._ranked(np.bincount(codes, minlength=len(labels)), labels, top)
+
+    def tech_by_month(self, top: int = 10) -> dict:
+        """
+        {"YYYY-MM": [(tech, count), ...]} by the month each posting was
+        created, the `top` techs per month, oldest month first. Rows
+        without created_utc are left out.
+        """
+        table = self._columns("tech_stack", "created_utc")
+        created = table.column("created_utc").to_numpy()
+        rows, codes, labels = self._techs(table)
+
+        known = ~np.isnan(created)
+        if not known.any():
+            return {}
+        # Months since 1970 per row, shifted so the first month is 0.
+        months = created[known].astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        first = months.min()
+        row_month = np.full(len(created), -1, dtype=np.int64)
+        row_month[known] = months - first
+
+        mention_month = row_month[rows]
+        keep = mention_month >= 0
+        span = int(months.max() - first) + 1
+        counts = np.bincount(mention_month[keep] * len(labels) + codes[keep], minlength=span * len(labels))
+        counts = counts.reshape(span, len(labels))
+        return {
+            str(np.datetime64(int(first + i), "M")): self._ranked(counts[i], labels, top)
+            for i in np.flatnonzero(counts.any(axis=1))
+        }
+
+    def yoe_by_city(self, bins=YOE_BINS, top: int = 20) -> dict:
+        """
+        {location: {"0-1": n, "1-3": n, ...}} for the `top` locations by
+        candidate count. Rows without experience_years are left out.
+        """
+        table = self._columns("location", "experience_years")
+        yoe = table.column("experience_years").to_numpy()
+        cities, labels = self._encode(table.column("location"))
+
+        known = ~np.isnan(yoe)
+        cities, yoe = cities[known], yoe[known]
+        buckets = np.digitize(yoe, bins[1:])
+        bucket_labels = [f"{lo}-{hi}" for lo, hi in zip(bins, bins[1:])] + [f"{bins[-1]}+"]
+
+        counts = np.bincount(cities * len(bins) + buckets, minlength=len(labels) * len(bins))
+        counts = counts.reshape(len(labels), len(bins))
+        return {
+            str(labels[i]): dict(zip(bucket_labels, counts[i].tolist()))
+            for i in self._top(counts.sum(axis=1), top)
+        }
+
+
+REPORTS = {
+    "tech": CandidateSnapshot.tech_popularity,
+    "tech-by-month": CandidateSnapshot.tech_by_month,
+    "yoe-by-city": CandidateSnapshot.yoe_by_city,
+}
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Standard reports over a candidates Parquet snapshot.")
+    arg_parser.add_argument("report", choices=sorted(REPORTS))
+    arg_parser.add_argument("snapshot", nargs="?", default="candidates.parquet")
+    arg_parser.add_argument("--top", type=int, default=None, help="entries per report (default: the report's own)")
+    args = arg_parser.parse_args()
+
+    snapshot = CandidateSnapshot(args.snapshot)
+    options = {"top": args.top} if args.top else {}
+    print(json.dumps(REPORTS[args.report](snapshot, **options), indent=2))
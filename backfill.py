@@ -0,0 +1,163 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from reddit_scrapper import RedditScraper
+from custom_parser import CommentParser
+from db_operation import SQLiteHandler
+from dedupe import Deduplicator
+from routine import comment_version, rejected_ids, resume_point, usable_candidates
+
+# --- CONFIG ---
+DB_PATH = "candidates.db"
+SUBREDDITS = ["developersIndia"]
+QUERY = "Who's looking for work"
+
+
+def month_range(since: str, until: str) -> list:
+    """'2024-11', '2025-02' -> ['november 2024', ..., 'february 2025']"""
+    year, month = map(int, since.split("-"))
+    end = tuple(map(int, until.split("-")))
+    months = []
+    while (year, month) <= end:
+        months.append(date(year, month, 1).strftime("%B %Y").lower())
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def discover(db: SQLiteHandler, scraper: RedditScraper, subreddits: list, months: list, max_pages: int):
+    """
+    Find each subreddit's megathread for every month not already recorded,
+    and record them as pending backfill threads.
+    """
+    for subreddit in subreddits:
+        recorded = {
+            row[0] for row in db.conn.execute(
+                "SELECT month FROM backfill_threads WHERE subreddit = ?", (subreddit,)
+            )
+        }
+        missing = [month for month in months if month not in recorded]
+        if not missing:
+            continue
+
+        print(f"🔍 Searching r/{subreddit} for {len(missing)} month(s)...")
+        found = scraper.find_megathreads(missing, subreddit, QUERY, max_pages=max_pages)
+        db.add_backfill_threads(
+            {
+                "link_id": post.get("name") or f"t3_{post.get('id')}",
+                "subreddit": subreddit,
+                "month": month,
+                "permalink": post["permalink"],
+            }
+            for month, post in found.items()
+        )
+        for month in missing:
+            if month not in found:
+                print(f"❌ r/{subreddit}: no megathread found for {month}")
+
+
+def fetch_thread(thread: dict, high_water: float, skip_ids: set, scraper_options: dict) -> dict:
+    """
+    Worker: fetch and parse one thread. Runs off the main thread, so it
+    never touches the DB; the main thread writes what it returns.
+    """
+    scraper = RedditScraper(auto_search=False, **scraper_options)
+    post = scraper.fetch_post(thread["permalink"], skip_ids=skip_ids, stream=True)
+    if not post:
+        return {"thread": thread, "candidates": [], "rejected": [], "high_water": high_water, "comments": 0, "ok": False}
+
+    seen = {"comments": 0, "high_water": high_water}
+
+    def changed_comments():
+        for comment in post["comments"]:
+            version = comment_version(comment)
+            seen["comments"] += 1
+            seen["high_water"] = max(seen["high_water"], version)
+            if version > high_water:
+                yield comment
+
+    rejected = []
+    candidates = list(usable_candidates(CommentParser(), changed_comments(), workers=1, rejected=rejected))
+    return {
+        "thread": thread,
+        "candidates": candidates,
+        "rejected": rejected_ids(rejected),
+        "high_water": resume_point(seen["high_water"], rejected),
+        "comments": seen["comments"],
+        "ok": not scraper.errors,
+    }
+
+
+def backfill(subreddits: list, since: str, until: str, workers: int = 4, rate_limit: float = 2.0,
+             max_pages: int = 10, db_path: str = DB_PATH, base_url: str = None):
+    """
+    Discover and ingest every megathread of `subreddits` between the
+    `since` and `until` months (YYYY-MM). Each thread is checkpointed in
+    backfill_threads once fully ingested, so re-running after an
+    interruption only processes the threads still pending, and those
+    resume from their high-water mark.
+    """
+    db = SQLiteHandler(db_path)
+    dedupe = Deduplicator(db)
+    scraper = RedditScraper(auto_search=False, rate_limit=rate_limit, base_url=base_url)
+    discover(db, scraper, subreddits, month_range(since, until), max_pages)
+
+    pending = db.pending_backfill_threads()
+    print(f"🧵 {len(pending)} thread(s) to ingest with {workers} worker(s)")
+
+    # Split the request budget between workers so the total stays under rate_limit.
+    scraper_options = {
+        "rate_limit": rate_limit / workers if rate_limit else None,
+        "max_workers": 2,
+        "base_url": base_url,
+    }
+    total = {"inserted": 0, "merged": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                fetch_thread, thread,
+                db.get_high_water(thread["link_id"]),
+                db.known_comment_ids(thread["link_id"]),
+                scraper_options
+            )
+            for thread in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            thread = result["thread"]
+            counts = dedupe.ingest(result["candidates"])
+            db.add_rejected_comments(thread["link_id"], result["rejected"])
+            for key in total:
+                total[key] += counts[key]
+            if result["ok"]:
+                db.set_high_water(thread["link_id"], result["high_water"])
+                db.mark_backfill_thread(thread["link_id"], "done")
+                print(f"✅ r/{thread['subreddit']} {thread['month']}: {result['comments']} comments, {counts['inserted']} new, {counts['merged']} merged")
+            else:
+                db.mark_backfill_thread(thread["link_id"], "failed")
+                print(f"⚠️ r/{thread['subreddit']} {thread['month']}: incomplete, will retry on the next run")
+
+    db.close()
+    print(f"\n✅ Backfill done. Stored {total['inserted']} new candidates and merged {total['merged']} repeat postings into '{db_path}'.")
+
+
+def main():
+    today = date.today().strftime("%Y-%m")
+    parser = argparse.ArgumentParser(description="Backfill megathreads over a range of months.")
+    parser.add_argument("--subreddits", default=",".join(SUBREDDITS), help="comma-separated subreddit names")
+    parser.add_argument("--since", required=True, help="first month, YYYY-MM")
+    parser.add_argument("--until", default=today, help="last month, YYYY-MM (default: this month)")
+    parser.add_argument("--workers", type=int, default=4, help="threads fetched concurrently")
+    parser.add_argument("--rate-limit", type=float, default=2.0, help="total requests per second")
+    parser.add_argument("--max-pages", type=int, default=10, help="search result pages per subreddit")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    backfill(
+        [name.strip() for name in args.subreddits.split(",") if name.strip()],
+        args.since, args.until, args.workers, args.rate_limit, args.max_pages, args.db
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: matching one ingest batch of new candidates against saved
+searches, looping over every (subscription, candidate) pair vs
+alerts.SubscriptionIndex.
+
+Subscriptions pick 0-3 techs, maybe a location and a min_yoe at random,
+and both ways must find the same matches. Run from the repo root:
+    python -m benchmarks.bench_alerts [candidates]
+"""
+import random
+import sys
+import time
+
+from alerts import SubscriptionIndex
+from benchmarks.bench_filter import LOCATIONS, make_candidates
+from candidate import Candidate
+from custom_parser import CommentParser
+from gazetteer import location_key
+
+
+def make_subscriptions(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    techs = sorted(CommentParser.TECH_STACK)
+    return [
+        {
+            "id": i + 1,
+            "chat_id": 1000 + i,
+            "techs": rng.sample(techs, rng.randint(0, 3)),
+            "location": rng.choice(LOCATIONS) if rng.random() < 0.6 else None,
+            "min_yoe": rng.choice([0.0, 1.0, 2.0, 3.0, 5.0]),
+        }
+        for i in range(count)
+    ]
+
+
+def naive_matches(subscriptions: list, candidates: list) -> set:
+    matches = set()
+    for candidate in candidates:
+        listed = {tech.lower() for tech in candidate.tech_stack}
+        location = location_key(candidate.location)
+        for s in subscriptions:
+            if (all(tech.lower() in listed for tech in s["techs"])
+                    and (not s["location"] or location_key(s["location"]) == location)
+                    and (candidate.experience_years or 0.0) >= s["min_yoe"]):
+                matches.add((s["id"], candidate.id))
+    return matches
+
+
+def main(batch: int = 1000):
+    candidates = [Candidate(id=i, **data) for i, data in enumerate(make_candidates(batch), 1)]
+    print(f"candidates per batch: {batch:,}\n")
+    for count in (100, 1_000, 10_000):
+        subscriptions = make_subscriptions(count)
+
+        start = time.perf_counter()
+        expected = naive_matches(subscriptions, candidates)
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SubscriptionIndex(subscriptions)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        found = {(s["id"], c.id) for s, c in index.match_many(candidates)}
+        indexed = time.perf_counter() - start
+
+        assert found == expected, "index and loop disagree"
+        print(f"  {count:>6,} subscriptions  {len(found):>8,} matches  "
+              f"loop {naive:7.3f} s   index {indexed:7.3f} s (+{built:.3f} s build)   {naive / indexed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,98 @@
+"""
+Benchmark: MinHash/LSH dedupe of people reposting across months.
+
+Simulates `people` developers, each posting in a share of `months`
+megathreads with a lightly edited blurb (a few words swapped, added or
+dropped), then ingests every posting through Deduplicator. Reports
+throughput, how many candidate rows were stored, and merge accuracy
+against the known identities. Run from the repo root:
+    python -m benchmarks.bench_dedupe [people] [months]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import FILLER, LOCATIONS
+from custom_parser import CommentParser
+from db_operation import SQLiteHandler
+from dedupe import Deduplicator
+
+EXTRA = "kafka microservices payments analytics mentoring startups healthcare logistics".split()
+
+
+def edit(rng: random.Random, words: list) -> list:
+    words = list(words)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.random()
+        pos = rng.randrange(len(words))
+        if op < 0.4:
+            words[pos] = rng.choice(EXTRA)
+        elif op < 0.7:
+            words.insert(pos, rng.choice(EXTRA))
+        elif len(words) > 10:
+            del words[pos]
+    return words
+
+
+def make_postings(people: int, months: int, repost: float = 0.6, seed: int = 42) -> list:
+    """Serialized candidates in posting order; "person" is the ground truth."""
+    rng = random.Random(seed)
+    techs = sorted(CommentParser.TECH_STACK)
+    base = [
+        (rng.choices(FILLER + EXTRA, k=rng.randint(25, 80)), sorted(rng.sample(techs, rng.randint(2, 8))))
+        for _ in range(people)
+    ]
+    postings = []
+    for month in range(months):
+        for person, (words, stack) in enumerate(base):
+            if month and rng.random() > repost:
+                continue
+            postings.append({
+                "person": person,
+                "comment_id": f"m{month}p{person}",
+                "link_id": f"t3_month{month}",
+                "created_utc": 1_700_000_000 + month * 30 * 86400 + person,
+                "author": f"user{person}",
+                "score": rng.randint(0, 30),
+                "location": rng.choice(LOCATIONS),
+                "experience_years": float(month // 12 + rng.randint(0, 8)),
+                "blurb": " ".join(edit(rng, words) if month else words),
+                "tech_stack": stack,
+            })
+    return postings
+
+
+def main(people: int = 5_000, months: int = 6):
+    postings = make_postings(people, months)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteHandler(os.path.join(tmp, "bench.db"))
+        dedupe = Deduplicator(db)
+        start = time.perf_counter()
+        counts = dedupe.ingest(postings, fast_ingest=True)
+        elapsed = time.perf_counter() - start
+
+        owner = dict(db.conn.execute("SELECT comment_id, candidate_id FROM candidate_postings"))
+        canonical = {}  # person -> candidate id of their first posting
+        person_of = {}  # candidate id -> person whose first posting created it
+        missed = wrong = 0
+        for posting in postings:
+            candidate_id = owner[posting["comment_id"]]
+            person = person_of.setdefault(candidate_id, posting["person"])
+            if person != posting["person"]:
+                wrong += 1
+            elif canonical.setdefault(person, candidate_id) != candidate_id:
+                missed += 1
+        rows = db.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+        db.close()
+
+    print(f"postings: {len(postings):,} from {people:,} people over {months} months")
+    print(f"  ingest:   {elapsed:.2f} s ({len(postings) / elapsed:,.0f} postings/s)")
+    print(f"  stored:   {rows:,} candidate rows ({counts['inserted']:,} inserted, {counts['merged']:,} merged)")
+    print(f"  missed:   {missed:,} repostings stored as a new candidate")
+    print(f"  wrong:    {wrong:,} postings merged into someone else")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
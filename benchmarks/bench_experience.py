@@ -0,0 +1,70 @@
+"""
+Benchmark: experience normalization, the old "N year(s)" regex vs the
+experience.py grammar (per call, memoized, and the parse_many batch API).
+
+First checks both against benchmarks.experience_corpus and exits non-zero
+if the grammar gets any entry wrong, then times a column of fields drawn
+from the corpus (with random case and spacing), as a backfill would see
+them. Run from the repo root:
+    python -m benchmarks.bench_experience [rows]
+"""
+import random
+import re
+import sys
+import time
+
+import experience
+from benchmarks.experience_corpus import CORPUS
+
+
+def legacy_normalize_experience(raw: str) -> float:
+    raw = raw.strip().lower()
+    if "fresher" in raw:
+        return 0.0
+    match = re.search(r"(\d+(\.\d+)?)\+?\s*(year|yr)", raw)
+    return float(match.group(1)) if match else 0.0
+
+
+def make_fields(count: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    noise = [str, str.lower, str.upper, lambda s: f" {s}  ", lambda s: s.replace(" ", "  ")]
+    return [rng.choice(noise)(rng.choice(CORPUS)[0]) for _ in range(count)]
+
+
+def _time(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(rows: int = 200_000):
+    legacy_wrong = [raw for raw, years in CORPUS if abs(legacy_normalize_experience(raw) - years) > 0.01]
+    wrong = [(raw, experience.parse_experience(raw), years) for raw, years in CORPUS
+             if abs(experience.normalize_experience(raw) - years) > 0.01]
+    print(f"corpus: {len(CORPUS)} phrasings, old regex wrong on {len(legacy_wrong)}, grammar wrong on {len(wrong)}")
+    for raw, parsed, years in wrong:
+        print(f"    {raw!r}: got {parsed.years} (confidence {parsed.confidence}), expected {years}")
+
+    fields = make_fields(rows)
+    uncached = experience.parse_experience.__wrapped__
+    timings = [
+        ("old regex", lambda: [legacy_normalize_experience(f) for f in fields]),
+        ("grammar, no cache", lambda: [uncached(f) for f in fields]),
+        ("grammar, memoized", lambda: [experience.parse_experience(f) for f in fields]),
+        ("parse_many", lambda: experience.parse_many(fields)),
+    ]
+    print(f"\nfields: {rows:,} ({len(set(fields)):,} distinct)")
+    results = {}
+    for name, fn in timings:
+        seconds, results[name] = _time(fn)
+        print(f"  {name:<18} {seconds:7.3f} s  {rows / seconds:>12,.0f} fields/s")
+    assert results["parse_many"] == results["grammar, no cache"], "parse_many and parse_experience disagree"
+
+    unsure = sum(1 for parsed in results["parse_many"] if parsed.confidence < 1.0)
+    print(f"\n  {unsure:,} fields ({unsure / rows:.0%}) parsed with confidence below 1")
+    if wrong:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
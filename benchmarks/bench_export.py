@@ -0,0 +1,86 @@
+"""
+Benchmark: the standard analytics reports (tech popularity by month, YOE
+distribution by city) computed from get_all() rows in Python vs from a
+Parquet snapshot with analytics.CandidateSnapshot.
+
+Builds a throwaway database of synthetic candidates, exports it with
+export.export_snapshot and reports export time, file sizes and each
+report's time both ways. Needs numpy and pyarrow.
+Run from the repo root:
+    python -m benchmarks.bench_export [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from analytics import YOE_BINS, CandidateSnapshot
+from benchmarks.bench_filter import make_candidates
+from db_operation import SQLiteHandler
+from export import export_snapshot
+
+# Postings spread over two years of megathreads.
+START = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+SPAN = 730 * 86400
+
+
+def dated_candidates(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for candidate in make_candidates(count, seed):
+        candidate["created_utc"] = START + rng.random() * SPAN
+        yield candidate
+
+
+def rows_tech_by_month(db: SQLiteHandler) -> dict:
+    counts = defaultdict(Counter)
+    for candidate in db.get_all():
+        if candidate.created_utc is None:
+            continue
+        month = datetime.fromtimestamp(candidate.created_utc, timezone.utc).strftime("%Y-%m")
+        counts[month].update(candidate.tech_stack)
+    return {month: counts[month].most_common(10) for month in sorted(counts)}
+
+
+def rows_yoe_by_city(db: SQLiteHandler) -> dict:
+    counts = defaultdict(lambda: [0] * len(YOE_BINS))
+    for candidate in db.get_all():
+        if candidate.experience_years is not None:
+            counts[candidate.location or ""][bisect_right(YOE_BINS, candidate.experience_years) - 1] += 1
+    return dict(sorted(counts.items(), key=lambda item: -sum(item[1]))[:20])
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(rows: int = 1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        snapshot_path = os.path.join(tmp, "bench.parquet")
+        db = SQLiteHandler(db_path)
+        db.insert_candidates(dated_candidates(rows), batch_size=10_000, fast_ingest=True)
+
+        export_seconds = timed(lambda: export_snapshot(db, snapshot_path))
+        print(f"rows: {rows:,}")
+        print(f"  export      {export_seconds:6.2f} s  "
+              f"{os.path.getsize(db_path) / 2**20:7.1f} MiB db -> {os.path.getsize(snapshot_path) / 2**20:6.1f} MiB parquet\n")
+
+        snapshot = CandidateSnapshot(snapshot_path)
+        reports = (
+            ("tech-by-month", lambda: rows_tech_by_month(db), snapshot.tech_by_month),
+            ("yoe-by-city", lambda: rows_yoe_by_city(db), snapshot.yoe_by_city),
+        )
+        for name, from_rows, from_snapshot in reports:
+            slow, fast = timed(from_rows), timed(from_snapshot)
+            print(f"  {name:<14} get_all {slow:6.2f} s   snapshot {fast:6.3f} s   {slow / fast:5.0f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
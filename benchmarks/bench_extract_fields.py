@@ -0,0 +1,66 @@
+"""
+Benchmark: table-driven extract_fields vs the old per-line, per-label scan.
+
+Run from the repo root:
+    python -m benchmarks.bench_extract_fields [count]
+"""
+import sys
+import time
+
+from custom_parser import CommentParser
+from benchmarks.corpus import make_comment_bodies
+
+
+class LegacyCommentParser(CommentParser):
+    def extract_fields(self, comment_text: str) -> dict:
+        result = {key: "" for key in self.FIELDS}
+        blurb_lines = []
+
+        lines = comment_text.splitlines()
+
+        for line in lines:
+            line = line.strip()
+            matched = False
+            for key in list(self.FIELDS.keys())[:-1]:  # exclude 'blurb'
+                for label in self.FIELDS[key]:
+                    if line.lower().startswith(label + ":"):
+                        result[key] = line.split(":", 1)[1].strip()
+                        matched = True
+                        break
+                if matched:
+                    break
+            if not matched:
+                blurb_lines.append(line)
+
+        if not result["blurb"]:
+            result["blurb"] = "\n".join(blurb_lines).strip()
+
+        result["experience_years"] = self.normalize_experience(result["experience"])
+        result["location"] = self.normalize_location(result["location"])
+
+        cv = result.get("cv_link", "").strip().lower()
+        result["cv_is_link"] = cv.startswith("http://") or cv.startswith("https://")
+
+        return result
+
+
+def _time(parser, bodies) -> float:
+    start = time.perf_counter()
+    for body in bodies:
+        parser.extract_fields(body)
+    return time.perf_counter() - start
+
+
+def main(count: int = 50_000):
+    bodies = make_comment_bodies(count)
+    legacy = _time(LegacyCommentParser(), bodies)
+    table = _time(CommentParser(), bodies)
+
+    print(f"comments: {count}")
+    print(f"legacy:   {legacy:.2f} s ({count / legacy:,.0f} comments/s)")
+    print(f"table:    {table:.2f} s ({count / table:,.0f} comments/s)")
+    print(f"speedup:  {legacy / table:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,35 @@
+"""
+Benchmark: full-thread fetch time against a local fake Reddit server with
+simulated latency, for several morechildren concurrency limits.
+
+Run from the repo root:
+    python -m benchmarks.bench_fetch [comments] [latency_seconds]
+"""
+import sys
+import time
+
+from reddit_scrapper import RedditScraper
+from benchmarks.corpus import make_thread
+from benchmarks.fake_reddit import FakeReddit
+
+
+def main(count: int = 5000, latency: float = 0.05):
+    thread = make_thread(count)
+    server = FakeReddit(thread, latency=latency).start()
+    try:
+        print(f"comments: {count:,}  latency: {latency * 1000:.0f} ms/request\n")
+        for workers in (1, 2, 4, 8):
+            # No response cache: every run has to hit the server.
+            scraper = RedditScraper(base_url=server.base_url, max_workers=workers, rate_limit=None, cache=False)
+            start = time.perf_counter()
+            post = scraper.fetch_post(thread["post"]["permalink"])
+            elapsed = time.perf_counter() - start
+            assert len(post["comments"]) == count, len(post["comments"])
+            print(f"workers={workers}: {elapsed:.2f} s")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 5000, float(args[1]) if len(args) > 1 else 0.05)
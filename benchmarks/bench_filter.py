@@ -0,0 +1,82 @@
+"""
+Benchmark: indexed filter_candidates vs the old LIKE '%tech%' scan.
+
+Builds a throwaway database of synthetic candidates, then times the same
+filters both ways. Run from the repo root:
+    python -m benchmarks.bench_filter [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from custom_parser import CommentParser
+from db_operation import SQLiteHandler
+
+QUERIES = [
+    {"techs": ["Python"]},
+    {"techs": ["Java", "SQL"]},
+    {"techs": ["AWS", "Docker"], "locations": ["Remote"], "min_yoe": 3.0},
+    {"locations": ["Bengaluru", "Pune"], "min_yoe": 8.0},
+]
+
+LOCATIONS = ["Bengaluru", "Delhi", "Hyderabad", "Mumbai", "Pune", "Remote", "Chennai"]
+
+
+def make_candidates(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    techs = sorted(CommentParser.TECH_STACK)
+    for i in range(count):
+        yield {
+            "author": f"user{i}",
+            "score": rng.randint(0, 50),
+            "location": rng.choice(LOCATIONS),
+            "experience_years": rng.choice([0.0, 1.0, 2.0, 3.0, 4.5, 6.0, 10.0]),
+            "blurb": "synthetic",
+            "tech_stack": sorted(rng.sample(techs, rng.randint(2, 8))),
+        }
+
+
+def legacy_filter(db, techs=None, locations=None, min_yoe=0.0) -> list:
+    query = "SELECT * FROM candidates WHERE experience_years >= ?"
+    args = [min_yoe]
+    for tech in techs or []:
+        query += " AND tech_stack LIKE ?"
+        args.append(f"%{tech}%")
+    if locations:
+        query += " AND (" + " OR ".join("location LIKE ?" for _ in locations) + ")"
+        args.extend(f"%{loc}%" for loc in locations)
+    return db.conn.execute(query, tuple(args)).fetchall()
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteHandler(os.path.join(tmp, "bench.db"), cache_size=0)  # time the indexes, not the result cache
+        start = time.perf_counter()
+        db.insert_candidates(make_candidates(rows), batch_size=10_000, fast_ingest=True)
+        db.conn.execute("ANALYZE")
+        print(f"rows: {rows:,} (loaded in {time.perf_counter() - start:.1f} s)\n")
+
+        for filters in QUERIES:
+            legacy_rows = len(legacy_filter(db, **filters))
+            indexed_rows = len(db.filter_candidates(**filters))
+            legacy = _best_of(lambda: legacy_filter(db, **filters))
+            indexed = _best_of(lambda: db.filter_candidates(**filters))
+            print(filters)
+            print(f"  legacy:  {legacy * 1000:8.1f} ms  {legacy_rows:>8,} rows (LIKE false positives included)")
+            print(f"  indexed: {indexed * 1000:8.1f} ms  {indexed_rows:>8,} rows")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
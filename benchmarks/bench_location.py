@@ -0,0 +1,83 @@
+"""
+Benchmark: location normalization, the old substring scan over seven
+aliases vs the gazetteer matcher (cold and memoized).
+
+Draws location lines from spellings seen in megathreads, with random case
+and spacing, and reports the time per call plus how many distinct values
+each way would store. Run from the repo root:
+    python -m benchmarks.bench_location [rows]
+"""
+import random
+import sys
+import time
+
+import gazetteer
+
+LEGACY_ALIASES = {
+    "bangalore": "Bengaluru",
+    "blr": "Bengaluru",
+    "delhi": "Delhi",
+    "hyd": "Hyderabad",
+    "mumbai": "Mumbai",
+    "pune": "Pune",
+    "remote": "Remote"
+}
+
+SPELLINGS = [
+    "Bangalore", "Bengaluru", "BLR", "B'lore", "Bangalore, Karnataka", "Bengaluru (open to relocate)",
+    "Banglore", "Delhi NCR", "New Delhi", "Gurgaon", "Gurugram, Haryana", "Noida", "Noida, UP",
+    "Hyderabad", "Hyd", "Hyderabad / Secunderabad", "Mumbai", "Navi Mumbai", "Bombay", "Thane",
+    "Pune", "Pune / Remote", "Remote (ex-Mumbai)", "Chennai", "Madras", "Kolkata", "Calcutta", "Kochi",
+    "Cochin", "Trivandrum", "Ahmedabad", "Coimbatore", "Jaipur", "Indore", "Chandigarh / Mohali",
+    "Remote", "Remote only", "WFH", "Anywhere in India", "Pan India", "India", "Singapore",
+    "Dubai, UAE", "Tumkur", "Hosur", "Kanyakumari", "Earth",
+]
+
+
+def legacy_normalize(raw: str) -> str:
+    raw = raw.lower().strip()
+    for alias, standard in LEGACY_ALIASES.items():
+        if alias in raw:
+            return standard
+    return raw.title()
+
+
+def make_locations(count: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    noise = [str, str.lower, str.upper, lambda s: f"  {s} ", lambda s: s.replace(" ", "  ")]
+    return [rng.choice(noise)(rng.choice(SPELLINGS)) for _ in range(count)]
+
+
+def _time(normalize, locations: list) -> tuple:
+    start = time.perf_counter()
+    results = [normalize(location) for location in locations]
+    return time.perf_counter() - start, results
+
+
+def main(rows: int = 200_000):
+    locations = make_locations(rows)
+    print(f"location lines: {rows:,} ({len(set(locations)):,} distinct)\n")
+
+    legacy, legacy_results = _time(legacy_normalize, locations)
+    gazetteer.lookup.cache_clear()
+    gazetteer.normalize_location.cache_clear()
+    cold, results = _time(gazetteer.normalize_location, locations)
+    warm, _ = _time(gazetteer.normalize_location, locations)
+    gazetteer.lookup.cache_clear()
+    uncached, _ = _time(gazetteer.normalize_location.__wrapped__, locations)
+
+    for name, seconds in (("substring scan", legacy), ("gazetteer, no cache", uncached),
+                          ("gazetteer, cold", cold), ("gazetteer, warm", warm)):
+        print(f"  {name:<20} {seconds:7.3f} s  {seconds / rows * 1e6:6.2f} us/line")
+
+    print(f"\n  distinct values stored: substring scan {len(set(legacy_results))}, "
+          f"gazetteer {len(set(results))} ({sum(1 for r in set(results) if gazetteer.location_id(r))} with an id)")
+    print("\n  where they differ:")
+    for spelling in SPELLINGS:
+        old, new = legacy_normalize(spelling), gazetteer.normalize_location(spelling)
+        if old != new:
+            print(f"    {spelling!r:<32} {old!r:<30} -> {new!r}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,54 @@
+"""
+Benchmark: tiered top-k ranking vs scoring and sorting every candidate.
+
+Builds a throwaway database of synthetic candidates, checks both ways
+return the same top page, then times them. Run from the repo root:
+    python -m benchmarks.bench_rank [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_filter import _best_of, make_candidates
+from candidate_index import CandidateIndex
+from db_operation import SQLiteHandler
+from ranking import CandidateRanker
+
+QUERIES = [
+    {"techs": ["Python"]},
+    {"techs": ["Python", "Django", "AWS"], "locations": ["Bengaluru"], "yoe": 3.0},
+    {"techs": ["React", "Node.js", "MongoDB", "Docker"], "yoe": 6.0},
+    {"locations": ["Pune"], "yoe": 2.0},
+]
+
+
+def full_sort(ranker: CandidateRanker, page_size: int, techs=None, locations=None, yoe=None) -> list:
+    """Score every candidate matching any tech, then sort them all."""
+    with ranker.index.lock:
+        everyone = len(ranker.index.attributes)
+        return ranker._rank(techs, locations, yoe, 0, everyone)[:page_size]
+
+
+def main(rows: int = 200_000, page_size: int = 10):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteHandler(os.path.join(tmp, "bench.db"))
+        db.insert_candidates(make_candidates(rows), batch_size=10_000, fast_ingest=True)
+        start = time.perf_counter()
+        ranker = CandidateRanker(CandidateIndex(db))
+        print(f"rows: {rows:,} (indexed in {time.perf_counter() - start:.1f} s)\n")
+
+        for query in QUERIES:
+            top = ranker.rank(page_size=page_size, **query)
+            expected = full_sort(ranker, page_size, **query)
+            assert [round(s, 9) for s, _ in top] == [round(s, 9) for s, _ in expected], query
+            sort_time = _best_of(lambda: full_sort(ranker, page_size, **query))
+            rank_time = _best_of(lambda: ranker.rank(page_size=page_size, **query))
+            print(query)
+            print(f"  full sort: {sort_time * 1000:8.1f} ms")
+            print(f"  top-k:     {rank_time * 1000:8.1f} ms  best {top[0][0]:.3f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,95 @@
+"""
+Benchmark: get_all() building Candidate records vs the old per-row dicts,
+and streaming the same rows with iter_all().
+
+Builds a throwaway database of synthetic candidates, then fetches every
+row each way, reporting time and the memory held by the result list (for
+iter_all, the peak while iterating).
+Run from the repo root:
+    python -m benchmarks.bench_rows [rows]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_filter import make_candidates
+from db_operation import SQLiteHandler
+
+
+def legacy_row_to_dict(row: tuple) -> dict:
+    return {
+        "id": row[0],
+        "author": row[1],
+        "score": row[2],
+        "location": row[3],
+        "relocate": row[4],
+        "type": row[5],
+        "notice_period": row[6],
+        "experience_years": row[7],
+        "cv_link": row[8],
+        "blurb": row[9],
+        "tech_stack": row[10].split(",") if row[10] else [],
+        "comment_id": row[11],
+        "link_id": row[12],
+        "created_utc": row[13],
+        "edited": row[14]
+    }
+
+
+def legacy_get_all(db: SQLiteHandler) -> list:
+    rows = db.conn.execute("SELECT * FROM candidates").fetchall()
+    return [legacy_row_to_dict(row) for row in rows]
+
+
+def measure(fn) -> tuple:
+    """(seconds, bytes still held by the result) for one call."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = fn()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, held
+
+
+def measure_stream(db: SQLiteHandler) -> tuple:
+    """(seconds, peak bytes) to iterate every row through iter_all()."""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in db.iter_all():
+        pass
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in db.iter_all():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(rows: int = 500_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteHandler(os.path.join(tmp, "bench.db"))
+        db.insert_candidates(make_candidates(rows), batch_size=10_000, fast_ingest=True)
+        print(f"rows: {rows:,}\n")
+
+        for name, fn in (("dicts", lambda: legacy_get_all(db)), ("Candidate", db.get_all)):
+            elapsed, held = measure(fn)
+            print(f"  {name:<10} {elapsed:6.2f} s  {held / 2**20:8.1f} MiB held  {held / rows:6.0f} B/row")
+        elapsed, peak = measure_stream(db)
+        print(f"  {'iter_all':<10} {elapsed:6.2f} s  {peak / 2**20:8.1f} MiB peak")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
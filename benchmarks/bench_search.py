@@ -0,0 +1,53 @@
+"""
+Benchmark: ranked full-text search (SQLiteHandler.search_text) vs a
+LIKE '%phrase%' scan over blurbs.
+
+Run from the repo root:
+    python -m benchmarks.bench_search [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from db_operation import SQLiteHandler
+from benchmarks.bench_filter import make_candidates, _best_of
+from benchmarks.corpus import FILLER
+
+QUERIES = ["distributed systems", "payments", '"search ranking"', "compilers kubernetes"]
+TOPICS = ["distributed systems", "payments", "compilers", "search ranking", "mobile apps", "kubernetes operators"]
+
+
+def make_blurb_candidates(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for candidate in make_candidates(count, seed):
+        words = rng.choices(FILLER, k=rng.randint(20, 60))
+        if rng.random() < 0.05:  # niche topics, like real blurbs
+            words += rng.choice(TOPICS).split()
+        rng.shuffle(words)
+        candidate["blurb"] = " ".join(words)
+        yield candidate
+
+
+def main(rows: int = 1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteHandler(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        db.insert_candidates(make_blurb_candidates(rows), batch_size=10_000, fast_ingest=True)
+        print(f"rows: {rows:,} (loaded in {time.perf_counter() - start:.1f} s)\n")
+
+        for query in QUERIES:
+            phrase = query.strip('"')
+            like = lambda: db.conn.execute(
+                "SELECT * FROM candidates WHERE blurb LIKE ?", (f"%{phrase}%",)
+            ).fetchall()
+            fts = lambda: db.search_text(query, limit=20)
+            print(query)
+            print(f"  LIKE scan: {_best_of(like) * 1000:8.1f} ms (unranked, all matches)")
+            print(f"  FTS5:      {_best_of(fts) * 1000:8.1f} ms (top 20 by bm25)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,96 @@
+"""
+Benchmark: cold start of the cli.py entry points, as cron runs them.
+
+Each command runs in a fresh interpreter `--runs` times and the median
+wall time is compared against --budget-ms (the script exits non-zero if
+any command is over). The ingest run goes to a local fake Reddit
+(benchmarks.fake_reddit) with a small thread, so it covers the whole
+ingest path without network access. --imports also lists each command's
+heaviest top-level imports (python -X importtime).
+Run from the repo root:
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 500] [--imports]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+
+from benchmarks.bench_filter import make_candidates
+from benchmarks.corpus import make_thread
+from benchmarks.fake_reddit import FakeReddit
+from db_operation import SQLiteHandler
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py")
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run(argv: list, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI, *argv], cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def heaviest_imports(argv: list, cwd: str, top: int = 5) -> list:
+    """[(module, cumulative ms)] for the slowest top-level imports of one run."""
+    result = subprocess.run([sys.executable, "-X", "importtime", CLI, *argv], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for match in IMPORT_LINE.finditer(result.stderr):
+        cumulative, indent, module = match.groups()
+        if not indent and module not in ("site", "encodings"):
+            imports.append((module, int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: -item[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cli.py cold start against a budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500)
+    parser.add_argument("--imports", action="store_true", help="show each command's heaviest imports")
+    args = parser.parse_args()
+
+    thread = make_thread(50)
+    server = FakeReddit(thread).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = SQLiteHandler(db_path)
+        db.insert_candidates(make_candidates(1000))
+        db.close()
+
+        commands = [
+            ("help", ["--help"]),
+            ("ingest --help", ["ingest", "--help"]),
+            ("query", ["query", "--db", db_path, "--tech", "Python", "--limit", "10"]),
+            ("ingest", ["ingest", "--db", db_path, "--permalink", thread["post"]["permalink"],
+                        "--base-url", server.base_url]),
+        ]
+        if find_spec("pyarrow"):
+            commands.append(("export", ["export", os.path.join(tmp, "bench.parquet"), "--db", db_path]))
+
+        over = []
+        print(f"{'command':<16} {'median':>9} {'min':>9}   (budget {args.budget_ms:.0f} ms, {args.runs} runs)")
+        for name, argv in commands:
+            times = [run(argv, tmp) * 1000 for _ in range(args.runs)]
+            median = statistics.median(times)
+            flag = "  OVER BUDGET" if median > args.budget_ms else ""
+            print(f"{name:<16} {median:7.0f} ms {min(times):7.0f} ms{flag}")
+            if args.imports:
+                for module, ms in heaviest_imports(argv, tmp):
+                    print(f"    {module:<28} {ms:7.1f} ms")
+            if flag:
+                over.append(name)
+    server.stop()
+
+    if over:
+        print(f"\n{len(over)} command(s) over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
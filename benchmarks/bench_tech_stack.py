@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: compiled tech-stack matcher vs the old per-tech substring scan.
+
+Run from the repo root:
+    python -m benchmarks.bench_tech_stack
+"""
+import random
+import timeit
+
+from custom_parser import CommentParser
+
+WORDS = (
+    "I am a backend developer with experience building scalable services "
+    "and dashboards for fintech and e-commerce clients using modern tooling "
+    "looking for remote roles open to relocation Google internship"
+).split()
+
+
+def legacy_detect_tech_stack(text: str) -> list:
+    found = []
+    for tech in CommentParser.TECH_STACK:
+        if tech.lower() in text.lower():
+            found.append(tech)
+    return sorted(set(found))
+
+
+def make_blurbs(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    techs = sorted(CommentParser.TECH_STACK)
+    blurbs = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(40, 160))
+        words += rng.sample(techs, rng.randint(2, 8))
+        rng.shuffle(words)
+        blurbs.append(" ".join(words))
+    return blurbs
+
+
+def main(count: int = 2000, repeat: int = 5):
+    parser = CommentParser()
+    blurbs = make_blurbs(count)
+
+    def run_legacy():
+        for blurb in blurbs:
+            legacy_detect_tech_stack(blurb)
+
+    def run_compiled():
+        for blurb in blurbs:
+            parser.detect_tech_stack(blurb)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=repeat))
+    compiled = min(timeit.repeat(run_compiled, number=1, repeat=repeat))
+
+    print(f"blurbs:   {count}")
+    print(f"legacy:   {legacy * 1000:.1f} ms ({count / legacy:,.0f} blurbs/s)")
+    print(f"compiled: {compiled * 1000:.1f} ms ({count / compiled:,.0f} blurbs/s)")
+    print(f"speedup:  {legacy / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Synthetic megathread comment generator shared by the benchmarks.
+Bodies follow the "Who's looking for work" template, with the same
+markdown variations people actually post.
+"""
+import json
+import random
+from datetime import datetime
+
+from custom_parser import CommentParser
+
+LOCATIONS = ["Bangalore", "BLR", "Delhi NCR", "Hyderabad", "Mumbai", "Pune", "Remote", "Chennai", "Kolkata"]
+TYPES = ["Full time", "Contract", "Internship", "Full time / Contract"]
+NOTICE = ["Immediate", "15 days", "30 days", "60 days", "Serving (LWD 30th)"]
+EXPERIENCE = ["Fresher", "6 months", "1 year", "2 years", "1.5 YOE", "2-3 yrs", "3+ years", "4.5 yrs", "5", "6 years", "10+ years"]
+FILLER = (
+    "I am a developer with experience building scalable services and dashboards "
+    "for fintech and e-commerce clients using modern tooling looking for remote "
+    "roles open to relocation shipped features owned on-call led a small team"
+).split()
+
+LABEL_STYLES = [
+    "{label}: {value}",
+    "**{label}:** {value}",
+    "**{label}**: {value}",
+    "- {label} - {value}",
+]
+
+
+def make_comment_body(rng: random.Random) -> str:
+    style = rng.choice(LABEL_STYLES)
+    techs = rng.sample(sorted(CommentParser.TECH_STACK), rng.randint(2, 8))
+    words = rng.choices(FILLER, k=rng.randint(20, 80)) + techs
+    rng.shuffle(words)
+    fields = [
+        ("Location", rng.choice(LOCATIONS)),
+        ("Willing to relocate", rng.choice(["Yes", "No"])),
+        ("Type", rng.choice(TYPES)),
+        ("Notice Period", rng.choice(NOTICE)),
+        ("Total years of experience", rng.choice(EXPERIENCE)),
+        ("Résumé/CV link", f"https://example.com/cv/{rng.randrange(10**6)}.pdf"),
+    ]
+    lines = [style.format(label=label, value=value) for label, value in fields]
+    lines.append(style.format(label="Blurb", value=""))
+    lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def make_comment_bodies(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [make_comment_body(rng) for _ in range(count)]
+
+
+def make_thread(count: int, seed: int = 42, inline: int = 200, post_id: str = "bench1", title: str = None) -> dict:
+    """
+    Build a synthetic megathread shaped like Reddit's JSON: the post listing
+    plus the comment listing, where only the first `inline` top-level
+    comments are embedded and the rest hide behind one "more" stub, the way
+    Reddit pages large threads.
+
+    Returns {"post": ..., "listing": [post_listing, comment_listing],
+    "things": {comment_id: t1_thing}} so a fake server can answer
+    /api/morechildren from "things".
+    """
+    rng = random.Random(seed)
+    title = title or f"Who's looking for work? - Monthly Megathread - {datetime.now():%B %Y}"
+    link_id = f"t3_{post_id}"
+    permalink = f"/r/developersIndia/comments/{post_id}/whos_looking_for_work/"
+    post = {
+        "id": post_id,
+        "name": link_id,
+        "title": title,
+        "selftext": "Post your details using the template below.",
+        "permalink": permalink,
+    }
+
+    things = {}
+    for i in range(count):
+        comment_id = f"c{i:x}"
+        things[comment_id] = {
+            "kind": "t1",
+            "data": {
+                "id": comment_id,
+                "name": f"t1_{comment_id}",
+                "parent_id": link_id,
+                "link_id": link_id,
+                "created_utc": 1_700_000_000.0 + i * 60,
+                "edited": False,
+                "author": f"user{i}",
+                "score": rng.randint(0, 50),
+                "body": make_comment_body(rng),
+            },
+        }
+
+    ids = list(things)
+    children = [things[comment_id] for comment_id in ids[:inline]]
+    if len(ids) > inline:
+        rest = ids[inline:]
+        children.append({
+            "kind": "more",
+            "data": {"id": rest[0], "name": f"t1_{rest[0]}", "parent_id": link_id,
+                     "count": len(rest), "children": rest},
+        })
+
+    listing = [
+        {"kind": "Listing", "data": {"children": [{"kind": "t3", "data": post}]}},
+        {"kind": "Listing", "data": {"children": children}},
+    ]
+    return {"post": post, "listing": listing, "things": things}
+
+
+def write_megathread(path: str, count: int, seed: int = 42, post_id: str = "bench1",
+                     deleted: float = 0.02, edited: float = 0.1, replies: float = 0.1) -> str:
+    """
+    Write a fully expanded megathread (post listing + `count` top-level
+    comments, as Reddit's /comments/<id>.json returns it) to `path`, one
+    comment at a time so even a million comments never sit in memory.
+    A share of comments is `deleted`, `edited` or carries a recruiter
+    reply, like the real thing. Returns `path`.
+    """
+    rng = random.Random(seed)
+    link_id = f"t3_{post_id}"
+    post = {
+        "id": post_id,
+        "name": link_id,
+        "title": f"Who's looking for work? - Monthly Megathread - {datetime.now():%B %Y}",
+        "selftext": "Post your details using the template below.",
+        "permalink": f"/r/developersIndia/comments/{post_id}/whos_looking_for_work/",
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[{"kind": "Listing", "data": {"children": [')
+        f.write(json.dumps({"kind": "t3", "data": post}))
+        f.write(']}}, {"kind": "Listing", "data": {"children": [')
+        for i in range(count):
+            comment_id = f"c{i:x}"
+            created = 1_700_000_000.0 + i * 60
+            gone = rng.random() < deleted
+            data = {
+                "id": comment_id,
+                "name": f"t1_{comment_id}",
+                "parent_id": link_id,
+                "link_id": link_id,
+                "created_utc": created,
+                "edited": created + rng.randint(60, 86400) if rng.random() < edited else False,
+                "author": "[deleted]" if gone else f"user{i}",
+                "score": rng.randint(0, 50),
+                "body": "[deleted]" if gone else make_comment_body(rng),
+                "replies": "",
+            }
+            if rng.random() < replies:
+                reply_id = f"r{i:x}"
+                data["replies"] = {"kind": "Listing", "data": {"children": [{"kind": "t1", "data": {
+                    "id": reply_id, "name": f"t1_{reply_id}", "parent_id": f"t1_{comment_id}",
+                    "link_id": link_id, "created_utc": created + 3600, "edited": False,
+                    "author": f"recruiter{rng.randrange(100)}", "score": 1,
+                    "body": "Sent you a DM, please check.", "replies": "",
+                }}]}}
+            if i:
+                f.write(", ")
+            f.write(json.dumps({"kind": "t1", "data": data}))
+        f.write("]}}]")
+    return path
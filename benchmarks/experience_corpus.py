@@ -0,0 +1,80 @@
+"""
+Experience field values as people write them in the megathreads, with
+the years each should parse to (ranges count as their lower bound).
+bench_experience checks the parser against these before timing it;
+add the phrasing and its answer here whenever a grammar fix goes in.
+"""
+
+CORPUS = [
+    # Plain durations
+    ("3 years", 3.0),
+    ("1 year", 1.0),
+    ("1 Year", 1.0),
+    ("10+ Years", 10.0),
+    ("3+ years", 3.0),
+    ("4.5 yrs", 4.5),
+    ("1yr", 1.0),
+    ("2 yr", 2.0),
+    ("0.5 yrs", 0.5),
+    ("4y", 4.0),
+    ("1.5 YOE", 1.5),
+    ("2 YOE", 2.0),
+    ("Two years", 2.0),
+    ("Around 2.5 years (1 yr full-time)", 2.5),
+    ("7 years in industry, 3 in ML", 7.0),
+    ("2024 graduate, 1 year experience", 1.0),
+    ("~3 years", 3.0),
+    ("A year", 1.0),
+    # Months
+    ("6 months", 0.5),
+    ("18 months", 1.5),
+    ("9 months (internship)", 0.75),
+    ("8 mos", 0.67),
+    ("18mo", 1.5),
+    ("1 year 6 months", 1.5),
+    ("1 yr and 4 months", 1.33),
+    ("2 years, 3 months", 2.25),
+    ("3+ yrs 6 months", 3.5),
+    # Ranges
+    ("2-3 yrs", 2.0),
+    ("2 - 3 years", 2.0),
+    ("2 to 3 years", 2.0),
+    ("5–7 years", 5.0),
+    ("6-8 months", 0.5),
+    ("6 months - 1 year", 0.5),
+    ("6 months to 1 year", 0.5),
+    ("1 year - 18 months", 1.0),
+    # Upper bounds count as one unit less
+    ("less than 1 year", 0.0),
+    ("Less than a year", 0.0),
+    ("<1 year", 0.0),
+    ("< 2 years", 1.0),
+    ("under 2 years", 1.0),
+    ("Under 6 months", 0.42),
+    ("below 3 yrs", 2.0),
+    # Bare numbers
+    ("3", 3.0),
+    ("0", 0.0),
+    ("~4", 4.0),
+    ("5+", 5.0),
+    ("2.5", 2.5),
+    ("2-3", 2.0),
+    ("YOE: 3", 3.0),
+    ("Total 6", 6.0),
+    # Freshers and students
+    ("Fresher", 0.0),
+    ("fresher", 0.0),
+    ("Fresher (6 months internship)", 0.5),
+    ("Fresh graduate", 0.0),
+    ("Entry-level", 0.0),
+    ("No experience", 0.0),
+    ("3rd year student", 0.0),
+    ("Final year B.Tech", 0.0),
+    # Nothing to go on
+    ("", 0.0),
+    ("N/A", 0.0),
+    ("since 2019", 0.0),
+    ("2019 - 2023", 0.0),
+    ("4th year B.Tech", 0.0),
+    ("Python 3", 0.0),
+]
@@ -0,0 +1,101 @@
+"""
+Local stand-in for the parts of reddit.com that RedditScraper talks to:
+subreddit search, the thread JSON and /api/morechildren, with ETag / 304
+support for conditional requests. Used to exercise
+and benchmark the scraper without network access:
+
+    server = FakeReddit(make_thread(5000), latency=0.05).start()
+    # or several threads: FakeReddit([make_thread(...), make_thread(...)])
+    scraper = RedditScraper(base_url=server.base_url)
+    ...
+    server.stop()
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeReddit:
+    def __init__(self, threads, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        threads is one make_thread() result or a list of them; search lists
+        them in the given order. latency is added to every response to
+        mimic a network round-trip.
+        """
+        self.threads = threads if isinstance(threads, list) else [threads]
+        self.latency = latency
+        self.requests = []  # request paths, in arrival order
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeReddit":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def route(self, path: str, query: dict):
+        """Return (status, payload) for a request."""
+        if path.endswith("/search.json"):
+            posts = [thread["post"] for thread in self.threads]
+            names = [post["name"] for post in posts]
+            after = query.get("after", [None])[0]
+            start = names.index(after) + 1 if after in names else 0
+            page = posts[start:start + int(query.get("limit", ["25"])[0])]
+            more = start + len(page) < len(posts)
+            return 200, {"data": {
+                "children": [{"kind": "t3", "data": post} for post in page],
+                "after": page[-1]["name"] if page and more else None,
+            }}
+        if path == "/api/morechildren.json":
+            link_id = query.get("link_id", [""])[0]
+            ids = query.get("children", [""])[0].split(",")
+            for thread in self.threads:
+                if thread["post"]["name"] == link_id:
+                    things = [thread["things"][i] for i in ids if i in thread["things"]]
+                    return 200, {"json": {"errors": [], "data": {"things": things}}}
+        for thread in self.threads:
+            if path == thread["post"]["permalink"] + ".json":
+                return 200, thread["listing"]
+        return 404, {"error": 404}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.requests.append(url.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                status, payload = server.route(url.path, parse_qs(url.query))
+                body = json.dumps(payload).encode()
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
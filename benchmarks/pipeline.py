@@ -0,0 +1,202 @@
+"""
+Benchmark: the whole ingest/query pipeline on synthetic megathreads.
+
+For each corpus size, writes a fully expanded megathread JSON file (see
+corpus.write_megathread; reused between runs via --corpus-dir) and
+measures every stage on it, offline:
+
+    load_json          json.load of the thread file
+    extract_comments   RedditScraper._extract_comments
+    extract_fields     CommentParser.extract_fields on every body
+    detect_tech_stack  CommentParser.detect_tech_stack on every blurb
+    serialize          CommentParser.serialize_many (what routine runs)
+    insert             SQLiteHandler.insert_candidates into a fresh DB
+    filter_candidates  the bench_filter queries, uncached
+
+reporting items, seconds (best of --repeat), items/s and peak memory
+(tracemalloc, in one more run of the stage; --no-memory skips it).
+Results can be written as JSON and compared against an earlier run, which
+exits non-zero on a regression. Run from the repo root:
+
+    python -m benchmarks.pipeline --sizes 1000,10000 --output base.json
+    python -m benchmarks.pipeline --sizes 1000,10000 --compare base.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_filter import QUERIES
+from benchmarks.corpus import write_megathread
+from custom_parser import CommentParser
+from db_operation import SQLiteHandler
+from reddit_scrapper import RedditScraper
+
+
+def measure(name: str, fn, items_of, trace: bool, repeat: int = 1) -> tuple:
+    """
+    Run fn() `repeat` times keeping the best time and, if `trace`, once
+    more under tracemalloc for peak memory. Returns (stage result dict,
+    fn's return value).
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        seconds = min(seconds, time.perf_counter() - start)
+    items = items_of(result)
+
+    peak = None
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "stage": name,
+        "items": items,
+        "seconds": round(seconds, 6),
+        "per_second": round(items / seconds, 1) if seconds else None,
+        "peak_bytes": peak,
+    }, result
+
+
+def run_size(path: str, count: int, workdir: str, workers: int, trace: bool, repeat: int = 1) -> list:
+    parser = CommentParser()
+    scraper = RedditScraper(auto_search=False, cache=False)
+    stages = []
+
+    def stage(name, fn, items_of=len):
+        result, value = measure(name, fn, items_of, trace, repeat)
+        stages.append(result)
+        return value
+
+    def load():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    listing = stage("load_json", load, lambda _: count)
+    children = listing[1]["data"]["children"]
+    comments = stage("extract_comments", lambda: scraper._extract_comments(children))
+    fields = stage("extract_fields", lambda: [parser.extract_fields(c["body"]) for c in comments])
+    stage("detect_tech_stack", lambda: [parser.detect_tech_stack(f["blurb"]) for f in fields])
+    candidates = stage("serialize", lambda: parser.serialize_many(comments, workers=workers))
+
+    db_path = os.path.join(workdir, f"pipeline-{count}.db")
+
+    def insert():
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        db = SQLiteHandler(db_path)
+        inserted = db.insert_candidates(candidates, batch_size=10_000, fast_ingest=True)
+        db.close()
+        return inserted
+
+    stage("insert", insert, lambda inserted: inserted)
+
+    db = SQLiteHandler(db_path, cache_size=0)
+
+    def queries():
+        return [len(db.filter_candidates(**filters)) for filters in QUERIES]
+
+    stage("filter_candidates", queries)
+    db.close()
+    return stages
+
+
+def compare(results: dict, baseline: dict, tolerance: float, out=sys.stdout) -> list:
+    """
+    Per (size, stage) throughput ratios against `baseline`; returns the
+    lines for stages slower than baseline by more than `tolerance`.
+    """
+    before = {
+        (run["comments"], stage["stage"]): stage
+        for run in baseline["runs"] for stage in run["stages"]
+    }
+    regressions = []
+    print(f"\n{'comments':>10} {'stage':<18} {'baseline/s':>12} {'now/s':>12} {'ratio':>7}", file=out)
+    for run in results["runs"]:
+        for stage in run["stages"]:
+            old = before.get((run["comments"], stage["stage"]))
+            if not old or not old["per_second"] or not stage["per_second"]:
+                continue
+            ratio = stage["per_second"] / old["per_second"]
+            line = (f"{run['comments']:>10,} {stage['stage']:<18} "
+                    f"{old['per_second']:>12,.0f} {stage['per_second']:>12,.0f} {ratio:>6.2f}x")
+            print(line, file=out)
+            if ratio < 1 - tolerance:
+                regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage on synthetic megathreads.")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated comment counts (1k to 1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="serialize_many processes (default: every core)")
+    parser.add_argument("--corpus-dir", default=None, help="where thread files are written and reused (default: a temp dir)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage, best time kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="print results as JSON instead of a table")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown allowed by --compare (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = args.corpus_dir or workdir
+        os.makedirs(corpus_dir, exist_ok=True)
+        for count in (int(size) for size in args.sizes.split(",")):
+            path = os.path.join(corpus_dir, f"megathread-{count}-{args.seed}.json")
+            if not os.path.exists(path):
+                write_megathread(path, count, seed=args.seed)
+            stages = run_size(path, count, workdir, args.workers, not args.no_memory, args.repeat)
+            results["runs"].append({"comments": count, "file_bytes": os.path.getsize(path), "stages": stages})
+
+            if not args.json:
+                print(f"\ncomments: {count:,} ({os.path.getsize(path) / 2**20:.1f} MiB of JSON)")
+                for s in stages:
+                    peak = f"{s['peak_bytes'] / 2**20:9.1f} MiB" if s["peak_bytes"] is not None else ""
+                    print(f"  {s['stage']:<18} {s['items']:>9,} items  {s['seconds']:8.3f} s  "
+                          f"{s['per_second'] or 0:>12,.0f}/s  {peak}")
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        out = sys.stderr if args.json else sys.stdout  # keep stdout valid JSON
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, out)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}", file=out)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
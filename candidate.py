@@ -0,0 +1,108 @@
+import sys
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def tech_tuple(tech_stack: str) -> tuple:
+    """
+    Split a stored comma-joined tech_stack into a tuple of interned names.
+    Cached, so rows with the same stack share one tuple.
+    """
+    return tuple(sys.intern(tech) for tech in tech_stack.split(",")) if tech_stack else ()
+
+
+class Candidate:
+    """
+    One candidate, as produced by CommentParser.serialize and returned by
+    SQLiteHandler queries. A __slots__ record (no per-instance dict) that
+    still reads like the dicts it replaced: candidate["author"],
+    candidate.get("cv_link") and candidate.author all work.
+
+    `experience` is the raw text (empty for rows stored before it was
+    kept); `cv_is_link` is only set by the parser, `id` only for stored
+    rows, `match_score` by ranking.
+    """
+
+    __slots__ = (
+        "id", "author", "score", "location", "relocate", "type", "notice_period",
+        "experience_years", "cv_link", "blurb", "tech_stack",
+        "comment_id", "link_id", "created_utc", "edited",
+        "experience", "cv_is_link", "match_score",
+    )
+
+    ROW_WIDTH = 18  # columns of a candidates row up to `experience`, see from_row
+
+    def __init__(self, id=None, author=None, score=0, location="", relocate="", type="", notice_period="",
+                 experience_years=0.0, cv_link="", blurb="", tech_stack=(),
+                 comment_id=None, link_id=None, created_utc=None, edited=0.0,
+                 experience="", cv_is_link=False, match_score=None):
+        self.id = id
+        self.author = author
+        self.score = score
+        self.location = location
+        self.relocate = relocate
+        self.type = type
+        self.notice_period = notice_period
+        self.experience_years = experience_years
+        self.cv_link = cv_link
+        self.blurb = blurb
+        self.tech_stack = tuple(tech_stack)
+        self.comment_id = comment_id
+        self.link_id = link_id
+        self.created_utc = created_utc
+        self.edited = edited
+        self.experience = experience
+        self.cv_is_link = cv_is_link
+        self.match_score = match_score
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "Candidate":
+        """
+        sqlite3 row_factory for `SELECT * FROM candidates` rows. Rows from
+        a file older than the current schema (read-only handles skip
+        migrations) are padded, their missing columns read as unset.
+        """
+        if len(row) < cls.ROW_WIDTH:
+            row = (*row, *(None,) * (cls.ROW_WIDTH - len(row)))
+        candidate = cls.__new__(cls)
+        (candidate.id, candidate.author, candidate.score, candidate.location, candidate.relocate,
+         candidate.type, candidate.notice_period, candidate.experience_years, candidate.cv_link,
+         candidate.blurb, tech_stack, candidate.comment_id, candidate.link_id,
+         candidate.created_utc, candidate.edited) = row[:15]
+        candidate.tech_stack = tech_tuple(tech_stack)
+        candidate.edited = candidate.edited or 0.0
+        candidate.experience = row[17] or ""
+        candidate.cv_is_link = False
+        candidate.match_score = None
+        return candidate
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Candidate):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Candidate(id={self.id!r}, author={self.author!r}, location={self.location!r}, tech_stack={self.tech_stack!r})"
@@ -0,0 +1,220 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional
+
+from candidate import Candidate
+from db_operation import SQLiteHandler
+from gazetteer import location_key
+
+_WILLING = re.compile(r"\s*(?:y(?:es)?|open|sure|anywhere)\b", re.I)
+
+# Set-bit offsets for every byte value, used to decode bitsets quickly.
+_BYTE_BITS = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+
+
+class CandidateIndex:
+    """
+    In-process bitmap index over a SQLiteHandler's candidates.
+
+    Every tech and every location gets one bitset (a Python int where bit N
+    is candidate id N), and experience is kept as a sorted array of distinct
+    values with one "at least this much" bitset per value. A filter is then
+    a handful of big-int ANDs/ORs; SQLite is only hit to load new rows and to
+    fetch the matching candidates by primary key.
+
+    Matches filter_candidates: techs AND (case-insensitive, exact names),
+    locations OR (by gazetteer.location_key), experience_years >= min_yoe.
+    Also keeps what ranking.CandidateRanker needs: a relocate bitset and each
+    candidate's (experience_years, score).
+
+    Safe to share between threads: refreshes and lookups are serialized on
+    an internal lock (open `db` with check_same_thread=False when sharing).
+    """
+
+    def __init__(self, db: SQLiteHandler):
+        self.db = db
+        self.lock = threading.RLock()
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Drop everything and index the whole table again. Needed after rows
+        are deleted; inserts and upserts are picked up by refresh().
+        """
+        with self.lock:
+            self._reset()
+            self.refresh()
+
+    def _reset(self):
+        self.tech_bits: Dict[str, int] = {}
+        self.location_bits: Dict[str, int] = {}
+        self.yoe_values: List[float] = []
+        self.yoe_at_least: List[int] = []
+        self.relocate_bits = 0
+        self.all_bits = 0
+        self.attributes: Dict[int, tuple] = {}  # id -> (experience_years, score), for ranking
+        self.max_score = 0
+        self.last_id = 0
+        self.last_updated = 0.0
+        self._version = None
+
+    def _data_version(self) -> tuple:
+        # data_version moves on commits from other connections,
+        # total_changes on writes through our own.
+        data_version = self.db.conn.execute("PRAGMA data_version").fetchone()[0]
+        return data_version, self.db.conn.total_changes
+
+    def refresh(self) -> int:
+        """
+        Index candidates inserted (ids above last_id) or updated (updated_at
+        above last_updated) since the last refresh. Returns the number of
+        rows (re)indexed. Skips the scan entirely when the database hasn't
+        changed.
+        """
+        with self.lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        version = self._data_version()
+        if version == self._version:
+            return 0
+
+        changed = "c.id > ? OR c.updated_at > ?"
+        args = (self.last_id, self.last_updated)
+        rows = self.db.conn.execute(
+            f"SELECT c.id, c.location, c.experience_years, c.updated_at, c.score, c.relocate "
+            f"FROM candidates c WHERE {changed} ORDER BY c.id",
+            args
+        ).fetchall()
+        techs = self.db.conn.execute(
+            f"SELECT ct.candidate_id, ct.tech FROM candidate_tech ct JOIN candidates c ON c.id = ct.candidate_id WHERE {changed}",
+            args
+        ).fetchall()
+
+        # Group ids per key first and build each bitset once: OR-ing bits in
+        # one row at a time copies the whole int every time.
+        updated, by_location, by_yoe, relocating = [], {}, {}, []
+        for candidate_id, location, yoe, updated_at, score, relocate in rows:
+            if candidate_id <= self.last_id:
+                updated.append(candidate_id)
+            by_location.setdefault(location_key(location), []).append(candidate_id)
+            if yoe is not None:  # NULL never satisfies experience_years >= ?
+                by_yoe.setdefault(yoe, []).append(candidate_id)
+            if relocate and _WILLING.match(relocate):
+                relocating.append(candidate_id)
+            self.attributes[candidate_id] = (yoe, score or 0)
+            self.max_score = max(self.max_score, score or 0)
+            self.last_id = max(self.last_id, candidate_id)
+            self.last_updated = max(self.last_updated, updated_at or 0.0)
+
+        by_tech = {}
+        for candidate_id, tech in techs:
+            by_tech.setdefault(tech.lower(), []).append(candidate_id)
+
+        if updated:
+            self._forget(self.ids_to_bits(updated))
+        for bitsets, grouped in ((self.location_bits, by_location), (self.tech_bits, by_tech)):
+            for key, ids in grouped.items():
+                bitsets[key] = bitsets.get(key, 0) | self.ids_to_bits(ids)
+        self._add_experience({yoe: self.ids_to_bits(ids) for yoe, ids in by_yoe.items()})
+        self.relocate_bits |= self.ids_to_bits(relocating)
+        self.all_bits |= self.ids_to_bits(row[0] for row in rows)
+
+        self._version = version
+        return len(rows)
+
+    def _forget(self, bits: int):
+        """Clear these candidates' bits everywhere before re-indexing them."""
+        for bitsets in (self.tech_bits, self.location_bits):
+            for key, value in bitsets.items():
+                if value & bits:
+                    bitsets[key] = value & ~bits
+        self.yoe_at_least = [value & ~bits for value in self.yoe_at_least]
+        self.relocate_bits &= ~bits
+
+    def _add_experience(self, by_yoe: Dict[float, int]):
+        """Add {experience_years: bitset} to the "at least this much" bitsets."""
+        for yoe in by_yoe:
+            pos = bisect_left(self.yoe_values, yoe)
+            if pos == len(self.yoe_values) or self.yoe_values[pos] != yoe:
+                # A new distinct value starts with everyone at or above it.
+                above = self.yoe_at_least[pos] if pos < len(self.yoe_at_least) else 0
+                insort(self.yoe_values, yoe)
+                self.yoe_at_least.insert(pos, above)
+        # Walk down from the top so each value picks up everyone above it too.
+        running = 0
+        for i in range(len(self.yoe_values) - 1, -1, -1):
+            running |= by_yoe.get(self.yoe_values[i], 0)
+            if running:
+                self.yoe_at_least[i] |= running
+
+    def match_bits(
+        self,
+        techs: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        min_yoe: float = 0.0
+    ) -> int:
+        """
+        Resolve a filter to a bitset of candidate ids.
+        """
+        with self.lock:
+            self._refresh()
+            return self._match_bits(techs, locations, min_yoe)
+
+    def _match_bits(self, techs, locations, min_yoe: float) -> int:
+        pos = bisect_left(self.yoe_values, min_yoe)
+        bits = self.yoe_at_least[pos] if pos < len(self.yoe_at_least) else 0
+
+        for tech in techs or []:
+            bits &= self.tech_bits.get(tech.lower(), 0)
+            if not bits:
+                return 0
+
+        if locations:
+            wanted = 0
+            for loc in locations:
+                wanted |= self.location_bits.get(location_key(loc), 0)
+            bits &= wanted
+
+        return bits
+
+    def match_ids(self, techs=None, locations=None, min_yoe: float = 0.0) -> List[int]:
+        """
+        Resolve a filter to a sorted list of candidate ids.
+        """
+        return self.bits_to_ids(self.match_bits(techs, locations, min_yoe))
+
+    def filter_candidates(self, techs=None, locations=None, min_yoe: float = 0.0,
+                          db: SQLiteHandler = None) -> List[Candidate]:
+        """
+        Drop-in replacement for SQLiteHandler.filter_candidates. Rows are
+        fetched through `db` when given (e.g. the calling thread's pooled
+        connection), else through the index's own.
+        """
+        ids = self.match_ids(techs, locations, min_yoe)
+        if db is None:
+            with self.lock:
+                return self.db.get_by_ids(ids)
+        return db.get_by_ids(ids)
+
+    @staticmethod
+    def ids_to_bits(ids: Iterable[int]) -> int:
+        """Bitset with bit N set for every id N, built in one pass."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        data = bytearray(max(ids) // 8 + 1)
+        for i in ids:
+            data[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(data, "little")
+
+    @staticmethod
+    def bits_to_ids(bits: int) -> List[int]:
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        ids = []
+        for offset, byte in enumerate(data):
+            if byte:
+                base = offset * 8
+                ids.extend(base + bit for bit in _BYTE_BITS[byte])
+        return ids
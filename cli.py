@@ -0,0 +1,131 @@
+import argparse
+import os
+import sys
+
+# One entry point for cron and humans alike:
+#
+#     python cli.py ingest [--discover | --permalink P] [--full] ...
+#     python cli.py bot
+#     python cli.py query --tech Python --location Remote --min-yoe 2
+#     python cli.py export candidates.parquet
+#
+# Only argparse is imported up front; each command imports what it needs
+# when it runs, so `ingest` never loads telegram and `query` never loads
+# requests. benchmarks/bench_startup.py keeps cold start under a budget.
+
+DB_PATH = "candidates.db"
+
+
+def run_ingest(args):
+    import routine
+
+    sinks = []
+    if args.metrics_json or args.metrics_prom:
+        from metrics import JSONLogSink, PrometheusFileSink
+
+        if args.metrics_json:
+            sinks.append(JSONLogSink(args.metrics_json))
+        if args.metrics_prom:
+            sinks.append(PrometheusFileSink(args.metrics_prom))
+
+    permalink = None if args.discover else args.permalink or routine.PERMALINK
+    routine.main(args.full, sinks, args.profile, permalink=permalink, db_path=args.db, base_url=args.base_url)
+
+
+def run_bot(args):
+    import DITele_bot
+
+    DITele_bot.main(args.db)
+
+
+def open_read_only(db_path: str):
+    """
+    Read-only handle on an existing database. A read-only open skips schema
+    setup, so like DITele_bot.main, open it writable once first to migrate
+    files created by older versions.
+    """
+    from db_operation import SQLiteHandler
+
+    SQLiteHandler(db_path).close()
+    return SQLiteHandler(db_path, read_only=True)
+
+
+def run_query(args):
+    from query_tester import print_candidates
+
+    db = open_read_only(args.db)
+    try:
+        if args.text:
+            results = db.search_text(args.text, limit=args.limit or 20, techs=args.tech,
+                                     locations=args.location, min_yoe=args.min_yoe)
+        elif args.author:
+            results = db.iter_by_author(args.author, limit=args.limit)
+        else:
+            results = db.iter_filter_candidates(args.tech, args.location, args.min_yoe, limit=args.limit)
+        print_candidates(results)
+    finally:
+        db.close()
+
+
+def run_export(args):
+    import time
+
+    from export import export_snapshot
+
+    db = open_read_only(args.db)
+    start = time.perf_counter()
+    try:
+        count = export_snapshot(db, args.output, args.batch_size, args.compression)
+    finally:
+        db.close()
+    print(f"✅ Exported {count} candidates to '{args.output}' in {time.perf_counter() - start:.1f}s.")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Scrape, store and search megathread candidates.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DB_PATH, help=f"SQLite database (default: {DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", parents=[common], help="ingest a megathread into the database")
+    where = ingest.add_mutually_exclusive_group()
+    where.add_argument("--permalink", help="thread to ingest (default: routine.PERMALINK)")
+    where.add_argument("--discover", action="store_true", help="search the subreddit for this month's megathread")
+    ingest.add_argument("--full", action="store_true", help="re-parse every comment (and stored experience fields), ignoring the high-water mark")
+    ingest.add_argument("--metrics-json", help="append this run's metrics as a JSON line to this file")
+    ingest.add_argument("--metrics-prom", help="write this run's metrics in Prometheus text format to this file")
+    ingest.add_argument("--profile", help="write cProfile stats for this run to this file")
+    ingest.add_argument("--base-url", help="Reddit host to talk to, e.g. a benchmarks.fake_reddit server")
+    ingest.set_defaults(run=run_ingest)
+
+    bot = commands.add_parser("bot", parents=[common], help="run the Telegram bot (BOT_TOKEN from the environment or .env)")
+    bot.set_defaults(run=run_bot)
+
+    query = commands.add_parser("query", parents=[common], help="print matching candidates")
+    query.add_argument("--tech", action="append", help="required tech, repeatable (all must match)")
+    query.add_argument("--location", action="append", help="accepted location, repeatable (any may match)")
+    query.add_argument("--min-yoe", type=float, default=0.0)
+    query.add_argument("--text", help="full-text search, best matches first")
+    query.add_argument("--author", help="authors containing this name")
+    query.add_argument("--limit", type=int, default=None)
+    query.set_defaults(run=run_query, reads_db=True)
+
+    export = commands.add_parser("export", parents=[common], help="write a Parquet snapshot for analytics (needs pyarrow)")
+    export.add_argument("output", nargs="?", default="candidates.parquet")
+    export.add_argument("--batch-size", type=int, default=100_000, help="rows per row group")
+    export.add_argument("--compression", default="zstd", help="Parquet codec (zstd, snappy, gzip, none)")
+    export.set_defaults(run=run_export, reads_db=True)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Read-only commands open an existing database; don't create an empty one.
+    if getattr(args, "reads_db", False) and not os.path.isfile(args.db):
+        parser.error(f"database '{args.db}' not found (run `cli.py ingest` first or pass --db)")
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,107 +1,13 @@
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
-class CommentParser:
-    # --- STATIC CONFIGS ---
-
-    FIELDS = {
-        "location": ["location"],
-        "relocate": ["willing to relocate", "relocate"],
-        "type": ["type"],
-        "notice_period": ["notice period", "np"],
-        "experience": ["total years of experience", "experience", "yoe"],
-        "cv_link": ["résumé/cv link", "cv", "resume"],
-        "blurb": ["blurb"]
-    }
-
-    LOCATION_ALIASES = {
-        "bangalore": "Bengaluru",
-        "blr": "Bengaluru",
-        "delhi": "Delhi",
-        "hyd": "Hyderabad",
-        "mumbai": "Mumbai",
-        "pune": "Pune",
-        "remote": "Remote"
-    }
-
-    TECH_STACK = {
-        "Python", "JavaScript", "TypeScript", "Java", "C++", "C", "Go", "Rust",
-        "Django", "Flask", "FastAPI", "React", "Angular", "Vue", "Svelte", "Next.js", "Express",
-        "Tailwind", "Bootstrap", "jQuery",
-        "MongoDB", "PostgreSQL", "MySQL", "SQLite", "Redis", "Elasticsearch",
-        "Docker", "Kubernetes", "Terraform", "Ansible", "GitHub Actions", "GitLab CI", "Jenkins",
-        "Nginx", "Apache", "Heroku",
-        "AWS", "GCP", "Azure", "Supabase", "Firebase", "Netlify", "Vercel", "Railway",
-        "REST", "GraphQL", "gRPC", "WebSocket",
-        "Power BI", "Tableau", "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "PyTorch",
-        "Matplotlib", "Excel", "Jupyter",
-        "Git", "Bitbucket", "Figma", "CI/CD", "TDD", "OAuth", "JWT", "Postman", "Linux", "Shell", "WSL",
-        "DSA", "Full-Stack", "Frontend", "Backend", "Microservices", "Agile", "Scrum", "NoSQL", "SQL",
-        "Responsive Design", "SEO",
-        "GATE", "LeetCode", "Codeforces", "HackerRank"
-    }
-
-    def normalize_experience(self, raw: str) -> float:
-        raw = raw.strip().lower()
-        if "fresher" in raw:
-            return 0.0
-        match = re.search(r"(\d+(\.\d+)?)\+?\s*(year|yr)", raw)
-        return float(match.group(1)) if match else 0.0
-
-    def normalize_location(self, raw: str) -> str:
-        raw = raw.lower().strip()
-        for alias, standard in self.LOCATION_ALIASES.items():
-            if alias in raw:
-                return standard
-        return raw.title()
-
-    def extract_fields(self, comment_text: str) -> dict:
-        result = {key: "" for key in self.FIELDS}
-        blurb_lines = []
-
-        lines = comment_text.splitlines()
-
-        for line in lines:
-            line = line.strip()
-            matched = False
-            for key in list(self.FIELDS.keys())[:-1]:  # exclude 'blurb'
-                for label in self.FIELDS[key]:
-                    if line.lower().startswith(label + ":"):
-                        result[key] = line.split(":", 1)[1].strip()
-                        matched = True
-                        break
-                if matched:
-                    break
-            if not matched:
-                blurb_lines.append(line)
-
-        if not result["blurb"]:
-            result["blurb"] = "\n".join(blurb_lines).strip()
-
-        result["experience_years"] = self.normalize_experience(result["experience"])
-        result["location"] = self.normalize_location(result["location"])
-
-        cv = result.get("cv_link", "").strip().lower()
-        result["cv_is_link"] = cv.startswith("http://") or cv.startswith("https://")
-
-        return result
-
-    def detect_tech_stack(self, text: str) -> list:
-        found = []
-        for tech in self.TECH_STACK:
-            if tech.lower() in text.lower():
-                found.append(tech)
-        return sorted(set(found))
+import experience
+import gazetteer
+from candidate import Candidate
 
-    def serialize(self, comment: dict) -> dict:
-        fields = self.extract_fields(comment.get("body", ""))
-        techs = self.detect_tech_stack(fields.get("blurb", ""))
-        return {
-            "author": comment.get("author", "[unknown]"),
-            "score": comment.get("score", 0),
-            **fields,
-            "tech_stack": techs
-        }
-import re
 
 class CommentParser:
     # --- STATIC CONFIGS ---
@@ -116,16 +22,6 @@ class CommentParser:
         "blurb": ["blurb"]
     }
 
-    LOCATION_ALIASES = {
-        "bangalore": "Bengaluru",
-        "blr": "Bengaluru",
-        "delhi": "Delhi",
-        "hyd": "Hyderabad",
-        "mumbai": "Mumbai",
-        "pune": "Pune",
-        "remote": "Remote"
-    }
-
     TECH_STACK = {
         "Python", "JavaScript", "TypeScript", "Java", "C++", "C", "Go", "Rust",
         "Django", "Flask", "FastAPI", "React", "Angular", "Vue", "Svelte", "Next.js", "Express",
@@ -143,38 +39,59 @@ class CommentParser:
         "GATE", "LeetCode", "Codeforces", "HackerRank"
     }
 
+    # Names that are also everyday words ("go", "rest", "c") only count when
+    # written with their canonical casing.
+    CASE_SENSITIVE_TECHS = {"C", "Go", "REST", "GATE"}
+
     def normalize_experience(self, raw: str) -> float:
-        raw = raw.strip().lower()
-        if "fresher" in raw:
-            return 0.0
-        match = re.search(r"(\d+(\.\d+)?)\+?\s*(year|yr)", raw)
-        return float(match.group(1)) if match else 0.0
+        # Ranges, months and bare numbers too; see experience.parse_experience.
+        return experience.normalize_experience(raw)
 
     def normalize_location(self, raw: str) -> str:
-        raw = raw.lower().strip()
-        for alias, standard in self.LOCATION_ALIASES.items():
-            if alias in raw:
-                return standard
-        return raw.title()
+        # Whole-word, memoized match against the bundled gazetteer.
+        return gazetteer.normalize_location(raw)
+
+    @classmethod
+    def _label_matcher(cls):
+        """
+        Build (once per class) an anchored regex over every FIELDS label
+        except 'blurb', plus a label -> field key lookup. Tolerates markdown
+        around the label: "**Location:** X", "**Location**: X", "- Location - X".
+        """
+        cached = cls.__dict__.get("_LABEL_MATCHER")
+        if cached is not None:
+            return cached
+
+        label_to_key = {}
+        for key, labels in cls.FIELDS.items():
+            if key == "blurb":
+                continue
+            for label in labels:
+                label_to_key.setdefault(label, key)
+
+        alternation = "|".join(re.escape(label) for label in sorted(label_to_key, key=len, reverse=True))
+        pattern = re.compile(
+            r"(?:[-*+>]\s+)?(?:\*\*|__)?"
+            r"(" + alternation + r")"
+            r"(?:\*\*|__)?\s*(?::|[-\u2013\u2014](?=\s))(?:\*\*|__)?"
+            r"\s*(.*?)\s*(?:\*\*|__)?$",
+            re.IGNORECASE
+        )
+
+        cls._LABEL_MATCHER = (pattern, label_to_key)
+        return cls._LABEL_MATCHER
 
     def extract_fields(self, comment_text: str) -> dict:
+        pattern, label_to_key = self._label_matcher()
         result = {key: "" for key in self.FIELDS}
         blurb_lines = []
 
-        lines = comment_text.splitlines()
-
-        for line in lines:
+        for line in comment_text.splitlines():
             line = line.strip()
-            matched = False
-            for key in list(self.FIELDS.keys())[:-1]:  # exclude 'blurb'
-                for label in self.FIELDS[key]:
-                    if line.lower().startswith(label + ":"):
-                        result[key] = line.split(":", 1)[1].strip()
-                        matched = True
-                        break
-                if matched:
-                    break
-            if not matched:
+            match = pattern.match(line)
+            if match:
+                result[label_to_key[match.group(1).lower()]] = match.group(2)
+            else:
                 blurb_lines.append(line)
 
         if not result["blurb"]:
@@ -188,19 +105,147 @@ class CommentParser:
 
         return result
 
-    def detect_tech_stack(self, text: str) -> list:
-        found = []
-        for tech in self.TECH_STACK:
-            if tech.lower() in text.lower():
-                found.append(tech)
-        return sorted(set(found))
+    @staticmethod
+    def _trie_pattern(names) -> str:
+        """
+        Fold names into a prefix-factored regex ("c(?:\\+\\+)?", ...) so the
+        engine walks one character trie per position instead of trying every
+        alternative in turn. Names are expected lowercased.
+        """
+        trie = {}
+        for name in names:
+            node = trie
+            for ch in name:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def build(node) -> str:
+            optional = "" in node
+            branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if optional:
+                # Prefer the longer name: "c++" over "c", "github actions" over "git".
+                return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+            return body
+
+        return build(trie)
+
+    @classmethod
+    def _tech_matcher(cls):
+        """
+        Build (once per class) a single compiled regex over the lowercased
+        TECH_STACK names. Every name must stand alone so "Go" doesn't match
+        "Google" or "Java" "JavaScript" (trailing version digits are allowed,
+        e.g. "Python3").
+        """
+        cached = cls.__dict__.get("_TECH_MATCHER")
+        if cached is not None:
+            return cached
+
+        canonical = {tech.lower(): tech for tech in cls.TECH_STACK}
+        pattern = re.compile(r"\b(?:" + cls._trie_pattern(canonical) + r")(?![^\W\d]|[+#])")
+
+        cls._TECH_MATCHER = (pattern, canonical)
+        return cls._TECH_MATCHER
 
-    def serialize(self, comment: dict) -> dict:
+    def detect_tech_stack(self, text: str) -> list:
+        pattern, canonical = self._tech_matcher()
+        lowered = text.lower()
+        if len(lowered) != len(text):  # e.g. "İ" lowers to two code points
+            lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+        found = set()
+        for match in pattern.finditer(lowered):
+            tech = canonical[match.group(0)]
+            if tech in self.CASE_SENSITIVE_TECHS and not text.startswith(tech, match.start()):
+                continue
+            found.add(tech)
+        return sorted(found)
+
+    def serialize(self, comment: dict) -> Candidate:
         fields = self.extract_fields(comment.get("body", ""))
-        techs = self.detect_tech_stack(fields.get("blurb", ""))
-        return {
-            "author": comment.get("author", "[unknown]"),
-            "score": comment.get("score", 0),
-            **fields,
-            "tech_stack": techs
-        }
+        return Candidate(
+            comment_id=comment.get("id"),
+            link_id=comment.get("link_id"),
+            created_utc=comment.get("created_utc"),
+            edited=comment.get("edited", 0.0),
+            author=comment.get("author", "[unknown]"),
+            score=comment.get("score", 0),
+            tech_stack=self.detect_tech_stack(fields["blurb"]),
+            **fields
+        )
+
+    def _serialize_chunk(self, comments: list, return_exceptions: bool = False) -> list:
+        results = []
+        for comment in comments:
+            try:
+                results.append(self.serialize(comment))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def serialize_many(
+        self,
+        comments,
+        workers: int = None,
+        chunksize: int = 500,
+        min_parallel: int = 2000,
+        return_exceptions: bool = False
+    ) -> list:
+        """
+        Serialize many comments, in input order.
+
+        Batches of at least `min_parallel` comments are split into chunks of
+        `chunksize` and parsed on a process pool with `workers` processes
+        (default: every core); smaller batches run in-process, where pool
+        start-up would cost more than it saves. With `return_exceptions`, a
+        comment that fails to parse yields its exception in place of a Candidate
+        instead of aborting the whole batch.
+        """
+        return list(self.iter_serialize(comments, workers, chunksize, min_parallel, return_exceptions))
+
+    def iter_serialize(
+        self,
+        comments,
+        workers: int = None,
+        chunksize: int = 500,
+        min_parallel: int = 2000,
+        return_exceptions: bool = False
+    ):
+        """
+        Lazy serialize_many: pulls comments from any iterable (e.g. a
+        streamed thread) and yields results in input order, holding at most
+        `min_parallel` comments plus 2 * `workers` chunks in memory.
+        """
+        workers = workers or os.cpu_count() or 1
+        comments = iter(comments)
+        head = list(islice(comments, min_parallel))
+
+        if len(head) < min_parallel:
+            yield from self._serialize_chunk(head, return_exceptions)
+            return
+
+        chunks = self._chunked(chain(head, comments), chunksize)
+        if workers == 1:
+            for chunk in chunks:
+                yield from self._serialize_chunk(chunk, return_exceptions)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(self._serialize_chunk, chunk, return_exceptions))
+                if len(in_flight) >= 2 * workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    @staticmethod
+    def _chunked(items, size: int):
+        items = iter(items)
+        while chunk := list(islice(items, size)):
+            yield chunk
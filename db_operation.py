@@ -1,11 +1,90 @@
+import json
+import re
 import sqlite3
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import gazetteer
+from candidate import Candidate
+from experience import parse_experience, parse_many
+from gazetteer import location_key, normalize_location
+
+
+class QueryCache:
+    """
+    Small LRU cache with per-entry TTL. Entries are tagged with the data
+    version they were computed at and treated as misses once the version
+    moves on.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (version, stored_at, value)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, value):
+        with self.lock:
+            self.entries[key] = (version, time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
 
 
 class SQLiteHandler:
-    def __init__(self, db_path: str = "candidates.db"):
-        self.conn = sqlite3.connect(db_path)
-        self.create_table()
+    def __init__(self, db_path: str = "candidates.db", read_only: bool = False, check_same_thread: bool = True,
+                 cache_size: int = 256, cache_ttl: float = 300):
+        """
+        read_only opens an existing database with mode=ro and skips schema
+        setup, for query-only users like the bot.
+
+        filter_candidates results are cached (cache_size entries, cache_ttl
+        seconds; cache_size=0 disables) until the data changes: our own
+        inserts bump self.data_version, and commits from other connections
+        show up in PRAGMA data_version.
+        """
+        self.db_path = db_path
+        self.data_version = 0
+        self.query_cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        if read_only:
+            uri = Path(db_path).absolute().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+            self.create_table()
 
     def create_table(self):
         """
@@ -27,104 +106,969 @@ class SQLiteHandler:
         );
         """
         self.conn.execute(query)
+        self.add_missing_columns()
+        self.conn.executescript("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_candidates_comment ON candidates (comment_id);
+        CREATE INDEX IF NOT EXISTS idx_candidates_location_id ON candidates (location_id);
+        CREATE INDEX IF NOT EXISTS idx_candidates_updated ON candidates (updated_at);
+        CREATE INDEX IF NOT EXISTS idx_candidates_link ON candidates (link_id);
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            link_id TEXT PRIMARY KEY,
+            high_water REAL NOT NULL,
+            updated_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS rejected_comments (
+            comment_id TEXT PRIMARY KEY,
+            link_id TEXT NOT NULL,
+            reason TEXT,
+            created_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_rejected_comments_link ON rejected_comments (link_id);
+        CREATE TABLE IF NOT EXISTS backfill_threads (
+            link_id TEXT PRIMARY KEY,
+            subreddit TEXT,
+            month TEXT,
+            permalink TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            updated_at REAL
+        );
+        """)
+        self.create_dedupe_tables()
+        self.create_alert_tables()
+        self.create_tech_index()
+        self.create_text_index()
         self.conn.commit()
 
+    # Columns added after the original schema, appended in this order to
+    # new and existing databases alike (so SELECT * column order is stable).
+    ADDED_COLUMNS = [
+        ("comment_id", "TEXT"),   # Reddit comment id, unique when present
+        ("link_id", "TEXT"),      # thread fullname, e.g. t3_1l0gai1
+        ("created_utc", "REAL"),
+        ("edited", "REAL"),       # Reddit edit timestamp, 0 if never edited
+        ("updated_at", "REAL"),   # local time of the last insert/update
+        ("location_id", "TEXT"),  # gazetteer id of the location, NULL if unknown
+        ("experience", "TEXT"),   # the experience field as written, for re-parsing
+        ("experience_confidence", "REAL"),  # experience.parse_experience's, NULL if no text
+    ]
+
+    def add_missing_columns(self):
+        """
+        Bring databases created by older versions up to the current schema.
+        """
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(candidates)")}
+        for name, col_type in self.ADDED_COLUMNS:
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE candidates ADD COLUMN {name} {col_type}")
+        if "location_id" not in existing:
+            self.renormalize_locations()
+
+    def renormalize_experience(self) -> int:
+        """
+        Re-parse the stored experience text of every row and refresh
+        experience_years and experience_confidence, e.g. after the grammar
+        in experience.py changed. Rows stored before the raw text was kept
+        are left as they are. Doesn't commit; returns the rows updated.
+        """
+        rows = self.conn.execute(
+            "SELECT id, experience FROM candidates WHERE experience IS NOT NULL AND experience <> ''"
+        ).fetchall()
+        parsed = parse_many(raw for _, raw in rows)
+        self.conn.executemany(
+            "UPDATE candidates SET experience_years = ?, experience_confidence = ? WHERE id = ?",
+            [(experience.years, experience.confidence, candidate_id)
+             for (candidate_id, _), experience in zip(rows, parsed)]
+        )
+        return len(rows)
+
+    def renormalize_locations(self):
+        """
+        Re-run location normalization over stored rows and fill in
+        location_id, for rows written before the gazetteer existed.
+        """
+        rows = self.conn.execute("SELECT id, location FROM candidates").fetchall()
+        self.conn.executemany(
+            "UPDATE candidates SET location = ?, location_id = ? WHERE id = ?",
+            [
+                (normalize_location(location), gazetteer.location_id(location), candidate_id)
+                for candidate_id, location in rows if location
+            ]
+        )
+
+    def create_dedupe_tables(self):
+        """
+        Tables behind dedupe.Deduplicator: every Reddit posting merged into a
+        candidate, the candidate's latest MinHash signature with the author
+        it is blocked on (empty until that author posts again), and its LSH
+        buckets (one row per band). Cleaned up when a candidate is deleted.
+        """
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(candidate_signatures)")}
+        if columns and "author" not in columns:
+            # Signed before the author was part of the blocking key;
+            # Deduplicator.index_existing registers every candidate again.
+            self.conn.executescript("""
+            DROP TABLE candidate_signatures;
+            DROP TABLE IF EXISTS candidate_lsh;
+            """)
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS candidate_postings (
+            comment_id TEXT PRIMARY KEY,
+            candidate_id INTEGER NOT NULL,
+            link_id TEXT,
+            created_utc REAL,
+            score INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_candidate_postings_candidate ON candidate_postings (candidate_id);
+        CREATE INDEX IF NOT EXISTS idx_candidate_postings_link ON candidate_postings (link_id);
+        CREATE TABLE IF NOT EXISTS candidate_signatures (
+            candidate_id INTEGER PRIMARY KEY,
+            author TEXT NOT NULL,
+            signature BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_candidate_signatures_author ON candidate_signatures (author);
+        CREATE TABLE IF NOT EXISTS candidate_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, candidate_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_candidate_lsh_candidate ON candidate_lsh (candidate_id);
+
+        CREATE TRIGGER IF NOT EXISTS candidates_dedupe_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidate_postings WHERE candidate_id = OLD.id;
+            DELETE FROM candidate_signatures WHERE candidate_id = OLD.id;
+            DELETE FROM candidate_lsh WHERE candidate_id = OLD.id;
+        END;
+        """)
+
+    def create_alert_tables(self):
+        """
+        Tables behind alerts: saved searches (techs comma-joined like
+        candidates.tech_stack) and the outbox of matches waiting to be sent,
+        at most one per chat and candidate, with failed send attempts.
+        """
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            techs TEXT,
+            location TEXT,
+            min_yoe REAL NOT NULL DEFAULT 0,
+            created_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_subscriptions_chat ON subscriptions (chat_id);
+        CREATE TABLE IF NOT EXISTS alert_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            subscription_id INTEGER NOT NULL,
+            created_at REAL,
+            sent_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (chat_id, candidate_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_alert_outbox_pending ON alert_outbox (id) WHERE sent_at IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_alert_outbox_chat ON alert_outbox (chat_id, id) WHERE sent_at IS NULL;
+        """)
+
+    # Splits a comma-joined tech_stack into (candidate_id, tech) rows.
+    # {source} must select (candidate_id, tech_stack).
+    SPLIT_TECH_QUERY = """
+    SELECT candidate_id, tech FROM (
+        WITH RECURSIVE split(candidate_id, tech, rest) AS (
+            SELECT candidate_id, '', COALESCE(tech_stack, '') || ',' FROM ({source})
+            UNION ALL
+            SELECT candidate_id,
+                   TRIM(substr(rest, 1, instr(rest, ',') - 1)),
+                   substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest <> ''
+        )
+        SELECT candidate_id, tech FROM split
+    ) WHERE tech <> ''
+    """
+
+    def create_tech_index(self):
+        """
+        Create the normalized candidate_tech(candidate_id, tech) table, the
+        triggers that keep it in sync with candidates.tech_stack, and the
+        indexes used by filter_candidates. Databases created before this
+        table existed are backfilled from tech_stack the first time.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidate_tech'"
+        ).fetchone()
+
+        new_rows = self.SPLIT_TECH_QUERY.format(source="SELECT NEW.id AS candidate_id, NEW.tech_stack")
+        self.conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS candidate_tech (
+            candidate_id INTEGER NOT NULL,
+            tech TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (tech, candidate_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_candidate_tech_candidate ON candidate_tech (candidate_id);
+        CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates (experience_years);
+        CREATE INDEX IF NOT EXISTS idx_candidates_location ON candidates (location COLLATE NOCASE);
+
+        CREATE TRIGGER IF NOT EXISTS candidates_tech_insert AFTER INSERT ON candidates BEGIN
+            INSERT OR IGNORE INTO candidate_tech (candidate_id, tech) {new_rows};
+        END;
+        CREATE TRIGGER IF NOT EXISTS candidates_tech_update AFTER UPDATE OF tech_stack ON candidates BEGIN
+            DELETE FROM candidate_tech WHERE candidate_id = OLD.id;
+            INSERT OR IGNORE INTO candidate_tech (candidate_id, tech) {new_rows};
+        END;
+        CREATE TRIGGER IF NOT EXISTS candidates_tech_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidate_tech WHERE candidate_id = OLD.id;
+        END;
+        """)
+
+        if not exists:
+            existing_rows = self.SPLIT_TECH_QUERY.format(source="SELECT id AS candidate_id, tech_stack FROM candidates")
+            self.conn.execute(f"INSERT OR IGNORE INTO candidate_tech (candidate_id, tech) {existing_rows}")
+
+    def create_text_index(self):
+        """
+        Create the FTS5 index over blurb, tech_stack and location, kept in
+        sync with candidates by triggers (external-content table, so the
+        text isn't stored twice). Existing rows are indexed the first time.
+        Skipped when this SQLite build lacks FTS5; search_text then raises.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'candidates_fts'"
+        ).fetchone()
+        try:
+            self.conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+                blurb, tech_stack, location,
+                content = 'candidates', content_rowid = 'id',
+                tokenize = 'porter unicode61'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+                INSERT INTO candidates_fts (rowid, blurb, tech_stack, location)
+                VALUES (NEW.id, NEW.blurb, NEW.tech_stack, NEW.location);
+            END;
+            CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+                INSERT INTO candidates_fts (candidates_fts, rowid, blurb, tech_stack, location)
+                VALUES ('delete', OLD.id, OLD.blurb, OLD.tech_stack, OLD.location);
+            END;
+            CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE OF blurb, tech_stack, location ON candidates BEGIN
+                INSERT INTO candidates_fts (candidates_fts, rowid, blurb, tech_stack, location)
+                VALUES ('delete', OLD.id, OLD.blurb, OLD.tech_stack, OLD.location);
+                INSERT INTO candidates_fts (rowid, blurb, tech_stack, location)
+                VALUES (NEW.id, NEW.blurb, NEW.tech_stack, NEW.location);
+            END;
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search disabled: {e}")
+            return
+
+        if not exists:
+            self.conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('rebuild')")
+
+    # Upsert: a comment seen again (e.g. after an edit) replaces its row.
+    # Rows without a comment_id never conflict and are always inserted.
+    INSERT_QUERY = """
+    INSERT INTO candidates (
+        author, score, location, relocate, job_type,
+        notice_period, experience_years, cv_link,
+        blurb, tech_stack,
+        comment_id, link_id, created_utc, edited, updated_at,
+        location_id, experience, experience_confidence
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (comment_id) DO UPDATE SET
+        author = excluded.author, score = excluded.score,
+        location = excluded.location, relocate = excluded.relocate,
+        job_type = excluded.job_type, notice_period = excluded.notice_period,
+        experience_years = excluded.experience_years, cv_link = excluded.cv_link,
+        blurb = excluded.blurb, tech_stack = excluded.tech_stack,
+        link_id = excluded.link_id, created_utc = excluded.created_utc,
+        edited = excluded.edited, updated_at = excluded.updated_at,
+        location_id = excluded.location_id, experience = excluded.experience,
+        experience_confidence = excluded.experience_confidence
+    """
+
     def insert_candidate(self, data: dict):
         """
-        Insert a structured candidate dictionary into the database.
+        Insert a structured candidate dictionary into the database
+        (or update the row already stored for the same comment_id).
         """
-        query = """
-        INSERT INTO candidates (
-            author, score, location, relocate, job_type,
-            notice_period, experience_years, cv_link,
-            blurb, tech_stack
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        techs = ",".join(data.get("tech_stack", []))
-        values = (
+        self.conn.execute(self.INSERT_QUERY, self._candidate_values(data))
+        self.conn.commit()
+        self.data_version += 1
+
+    def insert_candidates(
+        self,
+        candidates: Iterable[dict],
+        batch_size: int = 1000,
+        fast_ingest: bool = False
+    ) -> int:
+        """
+        Bulk-insert candidate dictionaries with executemany, committing one
+        transaction per `batch_size` rows. Returns the number of rows
+        written (inserted or updated, see INSERT_QUERY).
+
+        fast_ingest switches the database to WAL journaling with
+        synchronous=NORMAL for the duration of the load (far fewer fsyncs;
+        a crash can lose the last transactions but never corrupts the file)
+        and restores the previous settings afterwards.
+        """
+        inserted = 0
+        with self.fast_ingest_mode(fast_ingest):
+            batch = []
+            for data in candidates:
+                batch.append(self._candidate_values(data))
+                if len(batch) >= batch_size:
+                    inserted += self._insert_batch(batch)
+                    batch = []
+            if batch:
+                inserted += self._insert_batch(batch)
+
+        return inserted
+
+    @contextmanager
+    def fast_ingest_mode(self, enabled: bool = True):
+        """
+        Switch to WAL journaling with synchronous=NORMAL for the block and
+        restore the previous settings afterwards (no-op unless `enabled`).
+        """
+        if not enabled:
+            yield
+            return
+        journal_mode = self.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield
+        finally:
+            self.conn.execute(f"PRAGMA synchronous={synchronous}")
+            self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+
+    def _insert_batch(self, rows: List[tuple]) -> int:
+        with self.conn:  # one transaction per batch, rolled back on error
+            self.conn.executemany(self.INSERT_QUERY, rows)
+        self.data_version += 1
+        return len(rows)
+
+    def _candidate_values(self, data: dict) -> tuple:
+        """
+        Map a serialized candidate dictionary onto INSERT_QUERY's columns.
+        """
+        return (
             data.get("author"),
             data.get("score", 0),
             data.get("location", ""),
-            data.get("willing_to_relocate", ""),
+            data.get("relocate", ""),
             data.get("type", ""),
             data.get("notice_period", ""),
             data.get("experience_years", 0.0),
             data.get("cv_link", ""),
             data.get("blurb", ""),
-            techs
+            ",".join(data.get("tech_stack", [])),
+            data.get("comment_id"),
+            data.get("link_id"),
+            data.get("created_utc"),
+            data.get("edited", 0.0),
+            time.time(),
+            gazetteer.location_id(data.get("location", "")),
+            data.get("experience") or None,
+            parse_experience(data["experience"]).confidence if data.get("experience") else None
+        )
+
+    def upsert_candidate(self, data: dict) -> int:
+        """
+        Insert (or update, see INSERT_QUERY) one candidate without
+        committing, and return its row id.
+        """
+        cursor = self.conn.execute(self.INSERT_QUERY, self._candidate_values(data))
+        if data.get("comment_id") is None:
+            return cursor.lastrowid
+        # lastrowid isn't reliable when the upsert took the UPDATE path.
+        return self.conn.execute(
+            "SELECT id FROM candidates WHERE comment_id = ?", (data["comment_id"],)
+        ).fetchone()[0]
+
+    def upsert_candidates(self, candidates: List[dict]) -> List[int]:
+        """
+        upsert_candidate over a batch, with one executemany for the rows
+        that have a comment_id. Returns the row ids in input order.
+        """
+        keyed = [data for data in candidates if data.get("comment_id") is not None]
+        self.conn.executemany(self.INSERT_QUERY, [self._candidate_values(data) for data in keyed])
+        ids = dict(self.conn.execute(
+            "SELECT comment_id, id FROM candidates WHERE comment_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([data["comment_id"] for data in keyed]),)
+        ))
+        return [
+            ids[data["comment_id"]] if data.get("comment_id") is not None else self.upsert_candidate(data)
+            for data in candidates
+        ]
+
+    # Overwrite a candidate's details with a newer posting's, keeping its
+    # id and original comment_id (the row's upsert key).
+    MERGE_QUERY = """
+    UPDATE candidates SET
+        author = ?, score = ?, location = ?, relocate = ?, job_type = ?,
+        notice_period = ?, experience_years = ?, cv_link = ?,
+        blurb = ?, tech_stack = ?,
+        link_id = ?, created_utc = ?, edited = ?, updated_at = ?,
+        location_id = ?, experience = ?, experience_confidence = ?
+    WHERE id = ? AND COALESCE(created_utc, 0) <= ?
+    """
+
+    def merge_candidates(self, merges: List[tuple]):
+        """
+        Overwrite existing candidates' details with (candidate_id, data)
+        from a newer posting of theirs, without committing. A candidate is
+        left alone when its current posting is newer than `data`.
+        """
+        rows = []
+        for candidate_id, data in merges:
+            values = self._candidate_values(data)
+            rows.append((*values[:10], *values[11:], candidate_id, data.get("created_utc") or 0.0))
+        self.conn.executemany(self.MERGE_QUERY, rows)
+
+    def add_postings(self, postings: List[tuple]):
+        """
+        Record (candidate_id, data) pairs in candidate_postings; a posting
+        already recorded moves to the given candidate.
+        """
+        self.conn.executemany(
+            """
+            INSERT INTO candidate_postings (comment_id, candidate_id, link_id, created_utc, score)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (comment_id) DO UPDATE SET
+                candidate_id = excluded.candidate_id, score = excluded.score
+            """,
+            [
+                (data["comment_id"], candidate_id, data.get("link_id"), data.get("created_utc"), data.get("score", 0))
+                for candidate_id, data in postings if data.get("comment_id") is not None
+            ]
+        )
+
+    def posting_owners(self, comment_ids: List[str]) -> dict:
+        """
+        comment_id -> id of the candidate each known posting was merged into.
+        """
+        return dict(self.conn.execute(
+            "SELECT comment_id, candidate_id FROM candidate_postings "
+            "WHERE comment_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(comment_ids),)
+        ))
+
+    def get_postings(self, candidate_id: int) -> List[dict]:
+        """
+        A candidate's posting history, oldest first.
+        """
+        rows = self.conn.execute(
+            "SELECT comment_id, link_id, created_utc, score FROM candidate_postings "
+            "WHERE candidate_id = ? ORDER BY created_utc",
+            (candidate_id,)
+        ).fetchall()
+        return [dict(zip(("comment_id", "link_id", "created_utc", "score"), row)) for row in rows]
+
+    def set_signatures(self, signatures: List[tuple]):
+        """
+        Store (candidate_id, author, signature, buckets) rows, replacing
+        each candidate's LSH buckets (buckets[i] is band i's), without
+        committing.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO candidate_signatures (candidate_id, author, signature) VALUES (?, ?, ?)",
+            [(candidate_id, author, signature) for candidate_id, author, signature, _ in signatures]
+        )
+        self.conn.executemany(
+            "DELETE FROM candidate_lsh WHERE candidate_id = ?",
+            [(candidate_id,) for candidate_id, *_ in signatures]
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO candidate_lsh (band, bucket, candidate_id) VALUES (?, ?, ?)",
+            [
+                (band, bucket, candidate_id)
+                for candidate_id, _, _, buckets in signatures
+                for band, bucket in enumerate(buckets)
+            ]
+        )
+
+    def author_candidates(self, authors: List[str]) -> List[tuple]:
+        """
+        (candidate_id, author, blurb, tech_stack, signed) of every candidate
+        blocked on one of `authors`.
+        """
+        return self.conn.execute(
+            """
+            SELECT c.id, s.author, c.blurb, c.tech_stack, length(s.signature) > 0
+            FROM candidate_signatures s JOIN candidates c ON c.id = s.candidate_id
+            WHERE s.author IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(authors),)
+        ).fetchall()
+
+    def lsh_matches(self, keys: List[tuple]) -> List[tuple]:
+        """
+        (band, bucket, candidate_id) of every stored candidate in one of
+        the (band, bucket) `keys`.
+        """
+        if not keys:
+            return []
+        return self.conn.execute(
+            """
+            SELECT l.band, l.bucket, l.candidate_id FROM json_each(?) AS k
+            JOIN candidate_lsh l
+                ON l.band = json_extract(k.value, '$[0]') AND l.bucket = json_extract(k.value, '$[1]')
+            """,
+            (json.dumps(keys),)
+        ).fetchall()
+
+    def dedupe_state(self, candidate_ids: List[int]) -> List[tuple]:
+        """
+        (candidate_id, created_utc, author, signature, link_ids) of each
+        candidate, for Deduplicator: its newest posting's time, its
+        blocking author and signature (NULL when unsigned), and the
+        threads it has postings in (comma-joined).
+        """
+        return self.conn.execute(
+            """
+            SELECT c.id, c.created_utc, s.author, s.signature,
+                (SELECT group_concat(p.link_id) FROM candidate_postings p WHERE p.candidate_id = c.id)
+            FROM json_each(?) AS k
+            JOIN candidates c ON c.id = k.value
+            LEFT JOIN candidate_signatures s ON s.candidate_id = c.id
+            """,
+            (json.dumps(candidate_ids),)
+        ).fetchall()
+
+    def unsigned_candidates(self) -> List[tuple]:
+        """
+        (id, author, comment_id, link_id, created_utc, score) of candidates
+        without a row in candidate_signatures; the counts are compared
+        first so the usual case skips the scan.
+        """
+        stored, signed = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM candidates), (SELECT COUNT(*) FROM candidate_signatures)"
+        ).fetchone()
+        if stored <= signed:
+            return []
+        return self.conn.execute(
+            """
+            SELECT id, author, comment_id, link_id, created_utc, score FROM candidates c
+            WHERE NOT EXISTS (SELECT 1 FROM candidate_signatures s WHERE s.candidate_id = c.id)
+            """
+        ).fetchall()
+
+    def get_high_water(self, link_id: str) -> float:
+        """
+        Latest created/edited timestamp already ingested for a thread (0 if none).
+        """
+        row = self.conn.execute(
+            "SELECT high_water FROM ingest_state WHERE link_id = ?", (link_id,)
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def set_high_water(self, link_id: str, high_water: float, replace: bool = False):
+        """
+        Record a thread's high-water mark. It only moves forward unless
+        `replace`, for runs that saw the whole thread (ingest --full) and
+        may need to lower it so a comment that failed to parse is retried.
+        """
+        self.conn.execute(
+            """
+            INSERT INTO ingest_state (link_id, high_water, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (link_id) DO UPDATE SET
+                high_water = CASE WHEN ? THEN excluded.high_water ELSE MAX(high_water, excluded.high_water) END,
+                updated_at = excluded.updated_at
+            """,
+            (link_id, high_water, time.time(), replace)
+        )
+        self.conn.commit()
+
+    def add_backfill_threads(self, threads: Iterable[dict]):
+        """
+        Record discovered megathreads ({link_id, subreddit, month, permalink})
+        as pending. Threads already recorded keep their status.
+        """
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO backfill_threads (link_id, subreddit, month, permalink, updated_at)
+                VALUES (:link_id, :subreddit, :month, :permalink, :updated_at)
+                """,
+                [{**thread, "updated_at": time.time()} for thread in threads]
+            )
+
+    def pending_backfill_threads(self) -> List[dict]:
+        """
+        Recorded megathreads not yet ingested completely.
+        """
+        rows = self.conn.execute(
+            "SELECT link_id, subreddit, month, permalink FROM backfill_threads WHERE status != 'done' ORDER BY link_id"
+        ).fetchall()
+        return [dict(zip(("link_id", "subreddit", "month", "permalink"), row)) for row in rows]
+
+    def mark_backfill_thread(self, link_id: str, status: str):
+        self.conn.execute(
+            "UPDATE backfill_threads SET status = ?, updated_at = ? WHERE link_id = ?",
+            (status, time.time(), link_id)
         )
-        self.conn.execute(query, values)
         self.conn.commit()
 
+    def add_subscription(self, chat_id: int, techs: Optional[List[str]] = None,
+                         location: Optional[str] = None, min_yoe: float = 0.0) -> int:
+        """
+        Save a search to be alerted about; returns its id.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO subscriptions (chat_id, techs, location, min_yoe, created_at) VALUES (?, ?, ?, ?, ?)",
+                (chat_id, ",".join(techs or []), location, min_yoe or 0.0, time.time())
+            )
+        return cursor.lastrowid
+
+    def get_subscriptions(self, chat_id: Optional[int] = None) -> List[dict]:
+        """
+        Saved searches, all of them or one chat's, as {id, chat_id, techs, location, min_yoe}.
+        """
+        query = "SELECT id, chat_id, techs, location, min_yoe FROM subscriptions"
+        args = ()
+        if chat_id is not None:
+            query += " WHERE chat_id = ?"
+            args = (chat_id,)
+        return [
+            {"id": id, "chat_id": chat, "techs": techs.split(",") if techs else [], "location": location, "min_yoe": min_yoe}
+            for id, chat, techs, location, min_yoe in self.conn.execute(query + " ORDER BY id", args)
+        ]
+
+    def delete_subscriptions(self, chat_id: int) -> int:
+        """
+        Drop a chat's saved searches and its unsent alerts; returns how many searches.
+        """
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,)).rowcount
+            self.conn.execute("DELETE FROM alert_outbox WHERE chat_id = ? AND sent_at IS NULL", (chat_id,))
+        return deleted
+
+    def enqueue_alerts(self, alerts: Iterable[tuple]) -> int:
+        """
+        Queue (chat_id, candidate_id, subscription_id) alerts; a chat is
+        never queued the same candidate twice. Returns how many were new.
+        """
+        now = time.time()
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO alert_outbox (chat_id, candidate_id, subscription_id, created_at) VALUES (?, ?, ?, ?)",
+                ((chat_id, candidate_id, subscription_id, now) for chat_id, candidate_id, subscription_id in alerts)
+            )
+            return self.conn.total_changes - before
+
+    def pending_alerts(self, max_chats: int = 20, per_chat: int = 10, max_attempts: int = 5) -> List[tuple]:
+        """
+        Unsent alerts that failed fewer than max_attempts times, as (alert
+        id, chat_id, candidate_id): the `max_chats` chats waiting longest,
+        with up to `per_chat` of each one's oldest alerts.
+        """
+        return self.conn.execute(
+            """
+            WITH pending AS (
+                SELECT id, chat_id, candidate_id FROM alert_outbox
+                WHERE sent_at IS NULL AND attempts < ?
+            ), chats AS (
+                SELECT chat_id, MIN(id) AS first_id FROM pending
+                GROUP BY chat_id ORDER BY first_id LIMIT ?
+            ), ranked AS (
+                SELECT p.id, p.chat_id, p.candidate_id, c.first_id,
+                       ROW_NUMBER() OVER (PARTITION BY p.chat_id ORDER BY p.id) AS n
+                FROM pending p JOIN chats c ON c.chat_id = p.chat_id
+            )
+            SELECT id, chat_id, candidate_id FROM ranked WHERE n <= ? ORDER BY first_id, id
+            """,
+            (max_attempts, max_chats, per_chat)
+        ).fetchall()
+
+    def mark_alerts_sent(self, alert_ids: List[int]):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE alert_outbox SET sent_at = ? WHERE id = ?",
+                ((time.time(), alert_id) for alert_id in alert_ids)
+            )
+
+    def mark_alerts_failed(self, alert_ids: List[int]):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE alert_outbox SET attempts = attempts + 1 WHERE id = ?",
+                ((alert_id,) for alert_id in alert_ids)
+            )
+
+    def add_rejected_comments(self, link_id: str, rejected: List[tuple]):
+        """
+        Remember (comment_id, reason) for a thread's comments that parsed but
+        weren't worth storing (no blurb, no tech stack).
+        """
+        if not rejected:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rejected_comments (comment_id, link_id, reason, created_at) VALUES (?, ?, ?, ?)",
+                ((comment_id, link_id, reason, time.time()) for comment_id, reason in rejected)
+            )
+
+    def known_comment_ids(self, link_id: str) -> set:
+        """
+        Comment ids already handled for a thread: stored ones, merged
+        postings included, and ones rejected for their content.
+        """
+        # A merged candidate's row carries its newest posting's link_id but its
+        # first posting's comment_id, so trust candidate_postings where it has one.
+        rows = self.conn.execute(
+            """
+            SELECT comment_id FROM candidate_postings WHERE link_id = ?
+            UNION
+            SELECT comment_id FROM candidates c WHERE link_id = ?
+            AND NOT EXISTS (SELECT 1 FROM candidate_postings p WHERE p.comment_id = c.comment_id)
+            UNION
+            SELECT comment_id FROM rejected_comments WHERE link_id = ?
+            """,
+            (link_id, link_id, link_id)
+        )
+        return {row[0] for row in rows}
+
     def filter_candidates(
         self,
         techs: Optional[List[str]] = None,
         locations: Optional[List[str]] = None,
         min_yoe: float = 0.0
-    ) -> List[dict]:
+    ) -> List[Candidate]:
         """
         Filter candidates based on:
-        - techs: All keywords must be present (AND)
-        - locations: Any keyword can match (OR)
+        - techs: All techs must be present (AND, exact tech names)
+        - locations: Any location can match (OR, same place per the gazetteer)
         - min_yoe: Minimum years of experience
+
+        Results come from the query cache when the same (normalized) filter
+        ran before and the data hasn't changed since; treat them as read-only.
         """
-        query = "SELECT * FROM candidates WHERE experience_years >= ?"
+        if self.query_cache is None:
+            return self._filter_candidates(techs, locations, min_yoe)
+
+        key = (
+            tuple(sorted({tech.lower() for tech in techs or []})),
+            tuple(sorted({location_key(loc) for loc in locations or []})),
+            float(min_yoe)
+        )
+        version = self._current_version()
+        results = self.query_cache.get(key, version)
+        if results is None:
+            results = self._filter_candidates(techs, locations, min_yoe)
+            self.query_cache.put(key, version, results)
+        return list(results)
+
+    def _current_version(self) -> tuple:
+        external = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return self.data_version, external
+
+    def cache_stats(self) -> dict:
+        """
+        Hit/miss counters of the filter_candidates cache.
+        """
+        return self.query_cache.stats() if self.query_cache else {}
+
+    def _filter_candidates(self, techs, locations, min_yoe: float) -> List[Candidate]:
+        where, args = self._filter_clauses(techs, locations, min_yoe)
+        return self._candidates("SELECT * FROM candidates c WHERE " + where, args)
+
+    def _filter_clauses(self, techs, locations, min_yoe: float) -> tuple:
+        """
+        WHERE clause (over candidates aliased as c) and its arguments for
+        the techs / locations / min_yoe filters.
+        """
+        clauses = ["c.experience_years >= ?"]
         args = [min_yoe]
 
-        # Tech stack filters (AND match)
+        # Tech stack filters (AND match): intersect the per-tech index ranges
         if techs:
-            for tech in techs:
-                query += " AND tech_stack LIKE ?"
-                args.append(f"%{tech}%")
+            clauses.append("c.id IN (" + " INTERSECT ".join(
+                "SELECT candidate_id FROM candidate_tech WHERE tech = ?" for _ in techs
+            ) + ")")
+            args.extend(techs)
 
-        # Location filters (OR match)
+        # Location filters (OR match): gazetteer places by their indexed
+        # id, anything else by the normalized text
         if locations:
-            loc_clauses = []
-            for loc in locations:
-                loc_clauses.append("location LIKE ?")
-                args.append(f"%{loc}%")
-            if loc_clauses:
-                query += " AND (" + " OR ".join(loc_clauses) + ")"
+            place_ids = [gazetteer.location_id(loc) for loc in locations]
+            known = [place_id for place_id in place_ids if place_id]
+            unknown = [normalize_location(loc) for loc, place_id in zip(locations, place_ids) if not place_id]
+            matches = []
+            if known:
+                matches.append("c.location_id IN (" + ", ".join("?" for _ in known) + ")")
+            if unknown:
+                matches.append("c.location COLLATE NOCASE IN (" + ", ".join("?" for _ in unknown) + ")")
+            clauses.append("(" + " OR ".join(matches) + ")")
+            args.extend(known + unknown)
 
-        rows = self.conn.execute(query, tuple(args)).fetchall()
-        return [self._row_to_dict(row) for row in rows]
+        return " AND ".join(clauses), tuple(args)
 
-    def search_by_author(self, name: str) -> List[dict]:
+    def search_text(
+        self,
+        query: str,
+        limit: int = 20,
+        techs: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        min_yoe: float = 0.0
+    ) -> List[Candidate]:
+        """
+        Full-text search over blurb, tech_stack and location, best matches
+        first (bm25, blurb hits weighted highest). Words are ANDed and
+        stemmed ("payments" finds "payment"); a double-quoted part must
+        match as a phrase. Optional filters work as in filter_candidates.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        where, args = self._filter_clauses(techs, locations, min_yoe)
+        return self._candidates(
+            f"""
+            SELECT c.* FROM candidates_fts f JOIN candidates c ON c.id = f.rowid
+            WHERE candidates_fts MATCH ? AND {where}
+            ORDER BY bm25(candidates_fts, 3.0, 1.0, 0.5)
+            LIMIT ?
+            """,
+            (match, *args, limit)
+        )
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """
+        Turn free text into a safe FTS5 query: every word or "quoted phrase"
+        becomes a quoted string, so punctuation like C++ or node.js can't
+        break the query syntax.
+        """
+        terms = re.findall(r'"([^"]+)"|(\S+)', text)
+        return " ".join('"' + (phrase or word).replace('"', '""') + '"' for phrase, word in terms)
+
+    def search_by_author(self, name: str) -> List[Candidate]:
         """
         Search candidates by author name (partial match).
         """
         query = "SELECT * FROM candidates WHERE author LIKE ?"
-        rows = self.conn.execute(query, (f"%{name}%",)).fetchall()
-        return [self._row_to_dict(row) for row in rows]
+        return self._candidates(query, (f"%{name}%",))
+
+    def get_by_ids(self, ids: List[int], batch_size: int = 500) -> List[Candidate]:
+        """
+        Fetch candidates by primary key, in the order of `ids`.
+        """
+        by_id = {}
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            query = "SELECT * FROM candidates WHERE id IN (" + ", ".join("?" for _ in batch) + ")"
+            for candidate in self._candidates(query, batch):
+                by_id[candidate.id] = candidate
+        return [by_id[candidate_id] for candidate_id in ids if candidate_id in by_id]
 
-    def get_all(self) -> List[dict]:
+    def get_all(self) -> List[Candidate]:
         """
         Fetch all candidate entries from the database.
         """
         query = "SELECT * FROM candidates"
-        rows = self.conn.execute(query).fetchall()
-        return [self._row_to_dict(row) for row in rows]
-
-    def _row_to_dict(self, row: tuple) -> dict:
-        """
-        Convert a DB row tuple to a dictionary.
-        """
-        return {
-            "id": row[0],
-            "author": row[1],
-            "score": row[2],
-            "location": row[3],
-            "relocate": row[4],
-            "type": row[5],
-            "notice_period": row[6],
-            "experience_years": row[7],
-            "cv_link": row[8],
-            "blurb": row[9],
-            "tech_stack": row[10].split(",") if row[10] else []
-        }
+        return self._candidates(query)
+
+    def iter_all(self, after_id: int = 0, limit: Optional[int] = None, batch_size: int = 1000) -> Iterator[Candidate]:
+        """
+        Stream all candidates in id order, fetching `batch_size` rows at a
+        time, so memory stays flat however big the table is.
+
+        Keyset pagination: `after_id` skips to ids above the last one seen
+        and `limit` caps the page, e.g. list(db.iter_all(after_id=last, limit=50)).
+        Exhaust or close() the generator to release its cursor.
+        """
+        return self._iter_candidates("SELECT * FROM candidates c WHERE c.id > ?", (after_id,), limit, batch_size)
+
+    def iter_filter_candidates(
+        self,
+        techs: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        min_yoe: float = 0.0,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Candidate]:
+        """
+        Streaming, id-ordered filter_candidates (not cached), paged like iter_all.
+        """
+        where, args = self._filter_clauses(techs, locations, min_yoe)
+        return self._iter_candidates(
+            f"SELECT * FROM candidates c WHERE {where} AND c.id > ?", (*args, after_id), limit, batch_size
+        )
+
+    def iter_by_author(self, name: str, after_id: int = 0, limit: Optional[int] = None,
+                       batch_size: int = 1000) -> Iterator[Candidate]:
+        """
+        Streaming, id-ordered search_by_author, paged like iter_all.
+        """
+        return self._iter_candidates(
+            "SELECT * FROM candidates c WHERE c.author LIKE ? AND c.id > ?", (f"%{name}%", after_id), limit, batch_size
+        )
+
+    def _iter_candidates(self, query: str, args: tuple, limit: Optional[int], batch_size: int) -> Iterator[Candidate]:
+        query += " ORDER BY c.id"
+        if limit is not None:
+            query += " LIMIT ?"
+            args = (*args, limit)
+        cursor = self.conn.cursor()
+        cursor.row_factory = Candidate.from_row
+        try:
+            cursor.execute(query, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def _candidates(self, query: str, args=()) -> List[Candidate]:
+        """
+        Run a `SELECT *`-shaped candidates query and return Candidate
+        records, built straight from the cursor rows.
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = Candidate.from_row
+        return cursor.execute(query, args).fetchall()
 
     def close(self):
         """
         Close the SQLite database connection.
         """
         self.conn.close()
+
+
+class ConnectionPool:
+    """
+    One long-lived SQLiteHandler per thread (sqlite3 connections can't be
+    shared across threads), created on first use and reused after that.
+    Each is only used by its own thread, but opened with
+    check_same_thread=False so close() can run from whichever thread
+    shuts the pool down.
+    """
+
+    def __init__(self, db_path: str = "candidates.db", read_only: bool = True):
+        self.db_path = db_path
+        self.read_only = read_only
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.handlers = []
+
+    def get(self) -> SQLiteHandler:
+        handler = getattr(self.local, "handler", None)
+        if handler is None:
+            handler = SQLiteHandler(self.db_path, read_only=self.read_only, check_same_thread=False)
+            self.local.handler = handler
+            with self.lock:
+                self.handlers.append(handler)
+        return handler
+
+    def close(self):
+        with self.lock:
+            for handler in self.handlers:
+                handler.conn.close()
+            self.handlers = []
@@ -0,0 +1,281 @@
+import hashlib
+import re
+from array import array
+from collections import Counter
+from itertools import islice
+from operator import eq
+from typing import Dict, Iterable, List, Optional
+
+from db_operation import SQLiteHandler
+
+_WORD = re.compile(r"\w+")
+
+
+class MinHasher:
+    """
+    MinHash signatures over a candidate's word 2-shingles of the blurb plus
+    one token per tech. The share of equal slots between two signatures
+    estimates the Jaccard similarity of their token sets.
+
+    Each token is hashed once into one 32-bit value per slot (a single
+    SHAKE-128 digest, seeded) and every slot takes the minimum over the
+    tokens, a column-wise min done by map/zip in C rather than a Python
+    loop per slot. Hashing is deterministic, so stored signatures stay
+    comparable across runs.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 2, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.salt = seed.to_bytes(8, "little")
+
+    def tokens(self, data: dict) -> set:
+        words = _WORD.findall((data.get("blurb") or "").lower())
+        size = self.shingle_size
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))} if words else set()
+        shingles.update(f"tech:{tech.lower()}" for tech in data.get("tech_stack") or [])
+        return shingles
+
+    def signature(self, tokens: Iterable[str]) -> Optional[tuple]:
+        size = self.num_perm * 4
+        hashes = [array("I", hashlib.shake_128(self.salt + token.encode()).digest(size)) for token in tokens]
+        if not hashes:
+            return None
+        return tuple(map(min, zip(*hashes)))
+
+    @staticmethod
+    def similarity(left: tuple, right: tuple) -> float:
+        return sum(map(eq, left, right)) / len(left)
+
+
+class Deduplicator:
+    """
+    Dedupe stage between CommentParser.serialize and the database: each
+    serialized candidate either becomes a new candidate row or is merged
+    into the existing candidate it near-duplicates (same person posting a
+    lightly edited blurb in another month), which keeps its id, takes the
+    details of its newest posting and records every posting in
+    candidate_postings.
+
+    Near-duplicates are found with banded LSH over the MinHash signatures:
+    a candidate is compared only with those sharing a band bucket (looked
+    up by primary key in candidate_lsh), then accepted if the estimated
+    similarity reaches `threshold`. With 16 bands of 4 rows, pairs at 0.7
+    similarity share a bucket ~99% of the time, at 0.5 ~64%, at 0.3 ~12%.
+
+    Buckets are keyed on the author as well, so only postings by the same
+    Reddit account are ever compared, and a candidate never takes a second
+    posting from a thread it already has one in (a person posts once per
+    megathread; two similar comments there are two people). Postings
+    without an author ("[deleted]") are never merged.
+
+    An author's first posting can't be a repost, so it is stored unsigned
+    and only signed once they post again. Work is done a batch at a time:
+    the lookups for a batch are a handful of queries, matching runs in
+    memory (so a batch can merge into candidates it created itself), and
+    the writes are executemany calls.
+    """
+
+    MIN_TOKENS = 6  # too little text to tell people apart; never merged
+
+    def __init__(self, db: SQLiteHandler, threshold: float = 0.5, bands: int = 16, rows: int = 4):
+        self.db = db
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.hasher = MinHasher(num_perm=bands * rows)
+        self.inserted = self.merged = 0
+        self.index_existing()
+
+    @staticmethod
+    def _author(data: dict) -> str:
+        author = (data.get("author") or "").strip().lower()
+        return "" if author == "[deleted]" else author
+
+    def _buckets(self, signature: tuple, author: str) -> List[int]:
+        prefix = author.encode() + b"\0"
+        buckets = []
+        for band in range(self.bands):
+            chunk = array("I", signature[band * self.rows:(band + 1) * self.rows]).tobytes()
+            digest = hashlib.blake2b(prefix + chunk, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def _sign(self, data: dict, author: str) -> tuple:
+        """(signature, buckets) of a posting; (None, []) when it has too little text to merge."""
+        tokens = self.hasher.tokens(data)
+        if len(tokens) < self.MIN_TOKENS:
+            return None, []
+        signature = self.hasher.signature(tokens)
+        return signature, self._buckets(signature, author)
+
+    def find_duplicate(self, signature: tuple, buckets: List[int], author: str, link_id: Optional[str],
+                       index: Dict[tuple, list]) -> Optional[dict]:
+        """
+        The most similar candidate in `index` at or above the threshold,
+        by the same author and without a posting in `link_id`.
+        """
+        best_match, best = None, self.threshold
+        for band, bucket in enumerate(buckets):
+            for match, indexed in index.get((band, bucket), ()):
+                # Skip buckets of a signature the candidate has since replaced.
+                if match["signature"] is not indexed or match["author"] != author or link_id in match["links"]:
+                    continue
+                similarity = MinHasher.similarity(signature, indexed)
+                if similarity >= best:
+                    best_match, best = match, similarity
+        return best_match
+
+    def add(self, data: dict) -> int:
+        """
+        Store one serialized candidate (see add_batch). Doesn't commit.
+        Returns the candidate id.
+        """
+        return self.add_batch([data])[0][0]
+
+    def add_batch(self, batch: List[dict]) -> List[tuple]:
+        """
+        Store serialized candidates, merging each that is a posting we
+        already know or a near-duplicate of a stored candidate (or of one
+        earlier in the batch). Doesn't commit. Returns (candidate id,
+        whether it's a new candidate) per input.
+        """
+        authors = [self._author(data) for data in batch]
+        stored = self.db.author_candidates(sorted(set(authors) - {""}))
+        returning = {author for _, author, *_ in stored}
+        posts = Counter(authors)
+        # An author's first posting can't be a repost: it's only signed
+        # (from the stored row) once they post again.
+        signed = [
+            self._sign(data, author) if author and (author in returning or posts[author] > 1) else (None, [])
+            for data, author in zip(batch, authors)
+        ]
+        late = {
+            candidate_id: self._sign({"blurb": blurb, "tech_stack": tech_stack.split(",") if tech_stack else []}, author)
+            for candidate_id, author, blurb, tech_stack, has_signature in stored if not has_signature
+        }
+        owners = self.db.posting_owners([data["comment_id"] for data in batch if data.get("comment_id")])
+        hits = self.db.lsh_matches(sorted({
+            (band, bucket) for _, buckets in signed for band, bucket in enumerate(buckets)
+        }))
+
+        # In-memory view of every candidate the batch can touch.
+        known, index, resigned = {}, {}, {}
+        for candidate_id, created, author, signature, links in self.db.dedupe_state(
+                sorted(set(owners.values()) | set(late) | {candidate_id for _, _, candidate_id in hits})):
+            known[candidate_id] = match = {
+                "id": candidate_id, "created": created or 0.0, "author": author,
+                "signature": tuple(array("I", signature)) if signature else None, "buckets": None,
+                "links": set(links.split(",")) if links else set(), "new": None,
+            }
+            if late.get(candidate_id, (None,))[0]:
+                match["signature"], match["buckets"] = late[candidate_id]
+                for band, bucket in enumerate(match["buckets"]):
+                    index.setdefault((band, bucket), []).append((match, match["signature"]))
+                resigned[id(match)] = match
+        for band, bucket, candidate_id in hits:
+            match = known.get(candidate_id)
+            if match and match["signature"]:
+                index.setdefault((band, bucket), []).append((match, match["signature"]))
+        by_comment = {comment_id: known[owner] for comment_id, owner in owners.items() if owner in known}
+
+        created, postings, updates, results = [], [], {}, []
+        for data, author, (signature, buckets) in zip(batch, authors, signed):
+            comment_id = data.get("comment_id")
+            match = by_comment.get(comment_id) if comment_id else None
+            if match is None and signature:
+                match = self.find_duplicate(signature, buckets, author, data.get("link_id"), index)
+
+            fresh = match is None
+            if fresh:
+                match = {
+                    "id": None, "created": 0.0, "author": author, "signature": None, "buckets": [],
+                    "links": set(), "new": dict(data), "postings": [],
+                }
+                created.append(match)
+                resigned[id(match)] = match  # blocked on its author even while unsigned
+                self.inserted += 1
+            else:
+                self.merged += 1
+            newest = (data.get("created_utc") or 0.0) >= match["created"]
+            if match["new"] is None:
+                postings.append((match, data))
+                if newest:
+                    updates[match["id"]] = data  # only the newest one per batch is written
+            else:
+                match["postings"].append(data)
+                if newest and not fresh:
+                    # Not written yet: fold the newer details in before the insert.
+                    match["new"] = {**data, "comment_id": match["new"].get("comment_id")}
+            if newest:
+                match["created"] = data.get("created_utc") or 0.0
+            match["links"].add(data.get("link_id"))
+            if comment_id:
+                by_comment[comment_id] = match
+
+            if signature and newest:
+                match["signature"], match["buckets"] = signature, buckets
+                for band, bucket in enumerate(buckets):
+                    index.setdefault((band, bucket), []).append((match, signature))
+                resigned[id(match)] = match
+            results.append((match, fresh))
+
+        ids = self.db.upsert_candidates([match["new"] for match in created])
+        for match, candidate_id in zip(created, ids):
+            match["id"] = candidate_id
+        self.db.add_postings([(match["id"], data) for match in created for data in match["postings"]])
+        self.db.add_postings([(match["id"], data) for match, data in postings])
+        self.db.merge_candidates(list(updates.items()))
+        self.db.set_signatures([
+            (match["id"], match["author"], array("I", match["signature"] or ()).tobytes(), match["buckets"])
+            for match in resigned.values()
+        ])
+        return [(match["id"], fresh) for match, fresh in results]
+
+    def ingest(self, candidates: Iterable[dict], batch_size: int = 1000, fast_ingest: bool = False,
+               inserted_ids: Optional[list] = None) -> dict:
+        """
+        Dedupe and store serialized candidates, one add_batch and one
+        transaction per `batch_size`. Returns {"inserted": new candidates,
+        "merged": postings folded into existing ones}; the new candidates'
+        ids are appended to `inserted_ids` when given (e.g. for alerts).
+        """
+        inserted, merged = self.inserted, self.merged
+        candidates = iter(candidates)
+        with self.db.fast_ingest_mode(fast_ingest):
+            while True:
+                batch = list(islice(candidates, batch_size))
+                if not batch:
+                    break
+                try:
+                    results = self.add_batch(batch)
+                except Exception:
+                    self.db.conn.rollback()  # drop the unfinished batch
+                    raise
+                self._commit()
+                if inserted_ids is not None:
+                    inserted_ids.extend(candidate_id for candidate_id, fresh in results if fresh)
+        return {"inserted": self.inserted - inserted, "merged": self.merged - merged}
+
+    def _commit(self):
+        self.db.conn.commit()
+        self.db.data_version += 1
+
+    def index_existing(self) -> int:
+        """
+        Register candidates stored before deduping existed (or by a path
+        that skips it, or before the author was part of the blocking key)
+        under their author, unsigned, so they're signed and matched once
+        that author posts again. Existing duplicates are left as they are.
+        Returns the number of rows registered.
+        """
+        rows = self.db.unsigned_candidates()
+        postings, signatures = [], []
+        for candidate_id, author, comment_id, link_id, created_utc, score in rows:
+            data = {"comment_id": comment_id, "link_id": link_id, "created_utc": created_utc, "score": score}
+            postings.append((candidate_id, data))
+            signatures.append((candidate_id, self._author({"author": author}), b"", []))
+        with self.db.conn:
+            self.db.add_postings(postings)
+            self.db.set_signatures(signatures)
+        return len(rows)
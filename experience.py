@@ -0,0 +1,115 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple
+
+
+class Experience(NamedTuple):
+    years: float
+    confidence: float  # 1.0 explicit duration or fresher, down to 0.0 when nothing was understood
+
+
+# How sure each kind of match is. Ranges count as their lower bound, so a
+# "2-3 yrs" candidate shows up for min_yoe 2 but not 3; an upper bound
+# ("less than 2 years") counts as one unit less.
+CONFIDENCE = {
+    "duration": 1.0,
+    "fresher": 1.0,
+    "range": 0.8,
+    "upper_bound": 0.5,
+    "bare": 0.6,
+    "bare_range": 0.5,
+    "none": 0.0,
+}
+MAX_YEARS = 50.0  # anything above is a year ("2019") or a typo, not a duration
+
+_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_NUMBER = r"(?:\d+(?:\.\d+)?|\.\d+|" + "|".join(_WORDS) + r")"
+_ONE = r"an?(?=\s+(?:year|month)s?\b)"  # "a year", "an year", not "a m" in "am a ml"
+_TO = r"\s*(?:-|–|—|to)\s*"
+_MONTHS = r"(?:months?|mos?|mths?|m)"
+_YEARS = r"(?:years?|yrs?|yoe|y)"
+
+# "3 years", "1.5 YOE", "2-3 yrs", "3+ yrs 6 months", "6 months", "4y", "18mo",
+# "6 months - 1 year", "less than a year", "<6 months".
+_DURATION = re.compile(
+    r"(?:(?P<under>\b(?:less than|under|below)\b|<)\s*)?"
+    rf"(?<![\w.])(?P<low>{_NUMBER}|{_ONE})(?:\s*\+)?(?:{_TO}(?P<high>{_NUMBER}))?\s*\+?\s*"
+    rf"(?:(?P<months>{_MONTHS})|{_YEARS})\b"
+    rf"(?:\s*(?:and|,|&)?\s*(?P<extra>{_NUMBER})\s*\+?\s*{_MONTHS}\b"
+    rf"|{_TO}(?P<until>{_NUMBER})\s*\+?\s*(?:{_MONTHS}|{_YEARS})\b)?"
+)
+# The whole field is a number or a range of numbers: "3", "~4", "2-3", "5+", "YOE: 3".
+_BARE = re.compile(
+    r"(?:(?:total|approx\.?|approximately|around|about|over|nearly|yoe|exp|experience)\s*[:-]?\s*)*"
+    rf"[~≈]?\s*(?P<low>{_NUMBER})\s*\+?(?:{_TO}(?P<high>{_NUMBER})\s*\+?)?\.?"
+)
+_FRESHER = re.compile(
+    r"\b(?:fresher|fresh (?:grad|graduate)|new grad|entry[- ]level|no (?:work |prior )?experience|"
+    r"nil|none|student|final year)\b"
+)
+
+
+def _number(text: str) -> float:
+    return 1.0 if text in ("a", "an") else float(_WORDS.get(text, text))
+
+
+@lru_cache(maxsize=8192)
+def parse_experience(raw: str) -> Experience:
+    """
+    Years of experience in a free-text field, with how sure the parse is.
+    An explicit duration wins ("Fresher, 6 months internship" is 0.5), then
+    fresher wording, then a field that is just a number.
+    Memoized: the same few phrasings come up again and again.
+    """
+    text = " ".join((raw or "").lower().split())
+    if not text:
+        return Experience(0.0, CONFIDENCE["none"])
+
+    for match in _DURATION.finditer(text):
+        years = _number(match["low"])
+        if match["months"]:
+            years /= 12
+        elif match["extra"]:
+            years += _number(match["extra"]) / 12
+        if years <= MAX_YEARS:
+            if match["under"]:
+                years = max(0.0, years - (1 / 12 if match["months"] or match["extra"] else 1))
+                kind = "upper_bound"
+            else:
+                kind = "range" if match["high"] or match["until"] else "duration"
+            return Experience(round(years, 2), CONFIDENCE[kind])
+
+    if _FRESHER.search(text):
+        return Experience(0.0, CONFIDENCE["fresher"])
+
+    match = _BARE.fullmatch(text)
+    if match and _number(match["low"]) <= MAX_YEARS:
+        kind = "bare_range" if match["high"] else "bare"
+        return Experience(_number(match["low"]), CONFIDENCE[kind])
+
+    return Experience(0.0, CONFIDENCE["none"])
+
+
+def normalize_experience(raw: str) -> float:
+    """Years of experience in a free-text field, 0.0 when none is given."""
+    return parse_experience(raw).years
+
+
+def parse_many(raws: Iterable[str]) -> List[Experience]:
+    """
+    parse_experience over a whole column of fields (e.g. a backfill), in
+    input order. Each distinct string is parsed once, however many
+    candidates wrote it, and without going through the shared LRU cache,
+    so a large batch doesn't evict the ingest path's hot entries.
+    """
+    parsed = {}
+    results = []
+    for raw in raws:
+        experience = parsed.get(raw)
+        if experience is None:
+            experience = parsed[raw] = parse_experience.__wrapped__(raw)
+        results.append(experience)
+    return results
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+from operator import attrgetter
+
+from db_operation import SQLiteHandler
+
+# Snapshot columns, in file order: Candidate attribute -> Arrow type name.
+COLUMNS = [
+    ("id", "int64"),
+    ("author", "string"),
+    ("score", "int64"),
+    ("location", "string"),
+    ("relocate", "string"),
+    ("type", "string"),
+    ("notice_period", "string"),
+    ("experience_years", "float64"),
+    ("cv_link", "string"),
+    ("blurb", "string"),
+    ("tech_stack", "list<string>"),
+    ("comment_id", "string"),
+    ("link_id", "string"),
+    ("created_utc", "float64"),  # Unix seconds, as stored
+    ("edited", "float64"),
+]
+
+
+def require_pyarrow():
+    """
+    pyarrow is only needed for snapshots, so it's imported on first use
+    rather than made a dependency of the whole tool.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Snapshots need pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+def snapshot_schema():
+    pa, _ = require_pyarrow()
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "list<string>": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def export_snapshot(db: SQLiteHandler, path: str, batch_size: int = 100_000, compression: str = "zstd") -> int:
+    """
+    Stream every candidate into a compressed Parquet file at `path`, one
+    row group per `batch_size` rows, with tech_stack as a list column.
+    Memory stays around one batch however big the table is.
+
+    The file is written next to `path` and renamed into place at the end,
+    so readers only ever see a complete snapshot. Returns the row count.
+    """
+    pa, pq = require_pyarrow()
+    schema = snapshot_schema().with_metadata({
+        "source": os.path.abspath(db.db_path),
+        "exported_at": str(time.time()),
+    })
+    names = [name for name, _ in COLUMNS]
+    row_of = attrgetter(*names)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".parquet.tmp")
+    os.close(fd)
+    rows = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            candidates = db.iter_all(batch_size=batch_size)
+            while batch := [row_of(candidate) for candidate in islice(candidates, batch_size)]:
+                columns = dict(zip(names, zip(*batch)))
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema), row_group_size=batch_size)
+                rows += len(batch)
+            if not rows:
+                writer.write_table(schema.empty_table())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return rows
+
+
+if __name__ == "__main__":
+    from cli import main as cli_main
+
+    cli_main(["export", *sys.argv[1:]])
@@ -0,0 +1,191 @@
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+
+class Place(NamedTuple):
+    id: str        # stable canonical id, stored in candidates.location_id
+    name: str      # display name, stored in candidates.location
+    country: str   # ISO 3166 alpha-2, "" for Remote
+    kind: str      # "city", "remote" or "country"
+
+
+# Bundled offline gazetteer: (id, name, country, kind, aliases). The name
+# is an alias too. Aliases are matched as whole words, after
+# lowercasing and dropping punctuation ("b'lore" -> "blore"), so short
+# ones like "blr" or "hyd" never fire inside other words. Leave out
+# aliases that are everyday words or companies ("amd", "la", "sf").
+PLACES = [
+    # India
+    ("in-bengaluru", "Bengaluru", "IN", "city", "bangalore, blr, blore, bglr, bengaluru urban, banglore"),
+    ("in-mumbai", "Mumbai", "IN", "city", "bombay, bom, mumbai suburban"),
+    ("in-navi-mumbai", "Navi Mumbai", "IN", "city", "new bombay"),
+    ("in-thane", "Thane", "IN", "city", ""),
+    ("in-delhi", "Delhi", "IN", "city", "new delhi, delhi ncr, ncr, dilli, ndls"),
+    ("in-gurugram", "Gurugram", "IN", "city", "gurgaon, ggn, gurugram haryana"),
+    ("in-noida", "Noida", "IN", "city", ""),
+    ("in-greater-noida", "Greater Noida", "IN", "city", ""),
+    ("in-ghaziabad", "Ghaziabad", "IN", "city", ""),
+    ("in-faridabad", "Faridabad", "IN", "city", ""),
+    ("in-hyderabad", "Hyderabad", "IN", "city", "hyd, hyderbad, secunderabad, cyberabad"),
+    ("in-chennai", "Chennai", "IN", "city", "madras, chn"),
+    ("in-kolkata", "Kolkata", "IN", "city", "calcutta, kol"),
+    ("in-pune", "Pune", "IN", "city", "poona, pimpri chinchwad, pcmc"),
+    ("in-ahmedabad", "Ahmedabad", "IN", "city", "ahmadabad, amdavad"),
+    ("in-gandhinagar", "Gandhinagar", "IN", "city", "gift city"),
+    ("in-surat", "Surat", "IN", "city", ""),
+    ("in-vadodara", "Vadodara", "IN", "city", "baroda"),
+    ("in-rajkot", "Rajkot", "IN", "city", ""),
+    ("in-jaipur", "Jaipur", "IN", "city", ""),
+    ("in-jodhpur", "Jodhpur", "IN", "city", ""),
+    ("in-udaipur", "Udaipur", "IN", "city", ""),
+    ("in-chandigarh", "Chandigarh", "IN", "city", "chd, tricity"),
+    ("in-mohali", "Mohali", "IN", "city", "sas nagar"),
+    ("in-ludhiana", "Ludhiana", "IN", "city", ""),
+    ("in-amritsar", "Amritsar", "IN", "city", ""),
+    ("in-dehradun", "Dehradun", "IN", "city", "ddn"),
+    ("in-lucknow", "Lucknow", "IN", "city", "lko"),
+    ("in-kanpur", "Kanpur", "IN", "city", ""),
+    ("in-varanasi", "Varanasi", "IN", "city", "banaras, benares"),
+    ("in-prayagraj", "Prayagraj", "IN", "city", "allahabad"),
+    ("in-agra", "Agra", "IN", "city", ""),
+    ("in-meerut", "Meerut", "IN", "city", ""),
+    ("in-patna", "Patna", "IN", "city", ""),
+    ("in-ranchi", "Ranchi", "IN", "city", ""),
+    ("in-bhubaneswar", "Bhubaneswar", "IN", "city", "bhubaneshwar, bbsr"),
+    ("in-guwahati", "Guwahati", "IN", "city", "gauhati"),
+    ("in-indore", "Indore", "IN", "city", ""),
+    ("in-bhopal", "Bhopal", "IN", "city", ""),
+    ("in-gwalior", "Gwalior", "IN", "city", ""),
+    ("in-jabalpur", "Jabalpur", "IN", "city", ""),
+    ("in-raipur", "Raipur", "IN", "city", ""),
+    ("in-nagpur", "Nagpur", "IN", "city", ""),
+    ("in-nashik", "Nashik", "IN", "city", "nasik"),
+    ("in-aurangabad", "Aurangabad", "IN", "city", "chhatrapati sambhajinagar"),
+    ("in-goa", "Goa", "IN", "city", "panaji, panjim, margao"),
+    ("in-mysuru", "Mysuru", "IN", "city", "mysore"),
+    ("in-mangaluru", "Mangaluru", "IN", "city", "mangalore"),
+    ("in-hubballi", "Hubballi", "IN", "city", "hubli, dharwad, hubli dharwad"),
+    ("in-kochi", "Kochi", "IN", "city", "cochin, ernakulam, kakkanad, infopark"),
+    ("in-thiruvananthapuram", "Thiruvananthapuram", "IN", "city", "trivandrum, tvm, technopark"),
+    ("in-kozhikode", "Kozhikode", "IN", "city", "calicut"),
+    ("in-thrissur", "Thrissur", "IN", "city", "trichur"),
+    ("in-coimbatore", "Coimbatore", "IN", "city", "cbe, kovai"),
+    ("in-madurai", "Madurai", "IN", "city", ""),
+    ("in-tiruchirappalli", "Tiruchirappalli", "IN", "city", "trichy, tiruchi"),
+    ("in-salem", "Salem", "IN", "city", ""),
+    ("in-vellore", "Vellore", "IN", "city", ""),
+    ("in-visakhapatnam", "Visakhapatnam", "IN", "city", "vizag, vishakhapatnam"),
+    ("in-vijayawada", "Vijayawada", "IN", "city", ""),
+    ("in-tirupati", "Tirupati", "IN", "city", ""),
+    ("in-warangal", "Warangal", "IN", "city", ""),
+    ("in-jammu", "Jammu", "IN", "city", ""),
+    ("in-srinagar", "Srinagar", "IN", "city", ""),
+    ("in-shimla", "Shimla", "IN", "city", ""),
+    ("in", "India", "IN", "country", "pan india, anywhere in india, bharat"),
+    # Elsewhere
+    ("remote", "Remote", "", "remote", "wfh, work from home, remote only, fully remote, anywhere, remotely"),
+    ("sg-singapore", "Singapore", "SG", "city", ""),
+    ("ae-dubai", "Dubai", "AE", "city", ""),
+    ("ae-abu-dhabi", "Abu Dhabi", "AE", "city", ""),
+    ("qa-doha", "Doha", "QA", "city", ""),
+    ("sa-riyadh", "Riyadh", "SA", "city", ""),
+    ("gb-london", "London", "GB", "city", ""),
+    ("ie-dublin", "Dublin", "IE", "city", ""),
+    ("de-berlin", "Berlin", "DE", "city", ""),
+    ("de-munich", "Munich", "DE", "city", "munchen, muenchen"),
+    ("nl-amsterdam", "Amsterdam", "NL", "city", ""),
+    ("fr-paris", "Paris", "FR", "city", ""),
+    ("ch-zurich", "Zurich", "CH", "city", ""),
+    ("se-stockholm", "Stockholm", "SE", "city", ""),
+    ("pl-warsaw", "Warsaw", "PL", "city", ""),
+    ("pt-lisbon", "Lisbon", "PT", "city", ""),
+    ("es-barcelona", "Barcelona", "ES", "city", ""),
+    ("es-madrid", "Madrid", "ES", "city", ""),
+    ("il-tel-aviv", "Tel Aviv", "IL", "city", ""),
+    ("us-new-york", "New York", "US", "city", "nyc, new york city"),
+    ("us-san-francisco", "San Francisco", "US", "city", "bay area, sf bay area, silicon valley"),
+    ("us-seattle", "Seattle", "US", "city", ""),
+    ("us-austin", "Austin", "US", "city", ""),
+    ("us-boston", "Boston", "US", "city", ""),
+    ("us-chicago", "Chicago", "US", "city", ""),
+    ("ca-toronto", "Toronto", "CA", "city", ""),
+    ("ca-vancouver", "Vancouver", "CA", "city", ""),
+    ("au-sydney", "Sydney", "AU", "city", ""),
+    ("au-melbourne", "Melbourne", "AU", "city", ""),
+    ("nz-auckland", "Auckland", "NZ", "city", ""),
+    ("jp-tokyo", "Tokyo", "JP", "city", ""),
+    ("hk-hong-kong", "Hong Kong", "HK", "city", ""),
+    ("my-kuala-lumpur", "Kuala Lumpur", "MY", "city", ""),
+    ("np-kathmandu", "Kathmandu", "NP", "city", ""),
+    ("bd-dhaka", "Dhaka", "BD", "city", ""),
+    ("lk-colombo", "Colombo", "LK", "city", ""),
+]
+
+_PUNCTUATION = re.compile(r"['’.]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def _clean(text: str) -> str:
+    """Lowercase, drop apostrophes and dots, collapse everything else to single spaces."""
+    return _SEPARATORS.sub(" ", _PUNCTUATION.sub("", text.lower())).strip()
+
+
+def _build():
+    by_id: Dict[str, Place] = {}
+    by_alias: Dict[str, Place] = {}
+    for place_id, name, country, kind, aliases in PLACES:
+        place = Place(place_id, name, country, kind)
+        by_id[place_id] = place
+        for alias in [name, *aliases.split(",")]:
+            alias = _clean(alias)
+            if alias:
+                by_alias.setdefault(alias, place)
+    # Longest alias first, so "navi mumbai" wins over "mumbai" at the same spot.
+    alternatives = sorted(by_alias, key=len, reverse=True)
+    matcher = re.compile(r"\b(?:" + "|".join(re.escape(alias) for alias in alternatives) + r")\b")
+    return by_id, by_alias, matcher
+
+
+PLACES_BY_ID, _BY_ALIAS, _MATCHER = _build()
+
+
+@lru_cache(maxsize=8192)
+def lookup(raw: str) -> Optional[Place]:
+    """
+    The place a free-text location names, or None. When several are
+    named ("Pune / Remote", "India (Bengaluru)"), the first city or Remote
+    wins and a country only counts when nothing more specific is there.
+    Memoized: megathreads repeat the same few spellings endlessly.
+    """
+    broad = None
+    for match in _MATCHER.finditer(_clean(raw or "")):
+        place = _BY_ALIAS[match.group()]
+        if place.kind != "country":
+            return place
+        broad = broad or place
+    return broad
+
+
+def location_id(raw: str) -> Optional[str]:
+    """Canonical id of a free-text location ("B'lore, KA" -> "in-bengaluru"), None if unknown."""
+    place = lookup(raw)
+    return place.id if place else None
+
+
+@lru_cache(maxsize=8192)
+def normalize_location(raw: str) -> str:
+    """Canonical display name, else the input tidied up and title-cased."""
+    place = lookup(raw)
+    if place:
+        return place.name
+    return " ".join((raw or "").split()).strip(" ,;-").title()
+
+
+def location_key(raw: str) -> str:
+    """
+    What two locations must share to count as the same: the canonical id
+    when known, else the normalized text lowercased. Unchanged by
+    normalize_location, so stored and query-side keys agree.
+    """
+    return location_id(raw) or normalize_location(raw).lower()
@@ -0,0 +1,149 @@
+import codecs
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP response bodies, one JSON file per URL.
+
+    Entries younger than `ttl` seconds are served as-is; older ones keep
+    their ETag / Last-Modified so the caller can revalidate them with a
+    conditional request. When the directory grows past `max_bytes`, the
+    least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: str = ".reddit_cache", ttl: float = 300, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None  # running estimate of bytes on disk, set by evict()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the stored entry ({"body", "etag", "last_modified",
+        "stored_at"}) or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # recency for LRU eviction
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("stored_at", 0) < self.ttl
+
+    def put(self, key: str, body: str, etag: str = None, last_modified: str = None):
+        entry = {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time()
+        }
+        # Write-then-rename so concurrent readers never see a partial file.
+        data = json.dumps(entry)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self._stored(len(data))
+
+    def writer(self, key: str, etag: str = None, last_modified: str = None) -> "EntryWriter":
+        """
+        Store a body chunk by chunk as it downloads, without holding it all
+        in memory. The entry only replaces the old one on commit().
+        """
+        return EntryWriter(self, key, etag, last_modified)
+
+    def _stored(self, size: int):
+        with self.lock:
+            if self.size is not None:
+                self.size += size
+            over = self.size is None or self.size > self.max_bytes
+        if over:
+            self.evict()
+
+    def touch(self, key: str, entry: dict):
+        """Mark an entry as revalidated (e.g. after a 304)."""
+        self.put(key, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        with self.lock:
+            files = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+            self.size = total
+
+    def clear(self):
+        with self.lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    os.remove(entry.path)
+            self.size = 0
+
+
+class EntryWriter:
+    """
+    Streams one ResponseCache entry to a temp file: the same JSON document
+    put() writes, with the body escaped chunk by chunk.
+    """
+
+    def __init__(self, cache: ResponseCache, key: str, etag: str = None, last_modified: str = None):
+        self.cache = cache
+        self.key = key
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self.file = os.fdopen(fd, "w", encoding="utf-8")
+        head = json.dumps({"etag": etag, "last_modified": last_modified, "stored_at": time.time()})
+        self.size = self.file.write(head[:-1] + ', "body": "')
+
+    def write(self, chunk):
+        text = self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self.size += self.file.write(json.dumps(text)[1:-1])
+
+    def commit(self):
+        self.write(self.utf8.decode(b"", final=True))
+        self.size += self.file.write('"}')
+        self.file.close()
+        os.replace(self.tmp_path, self.cache._path(self.key))
+        self.cache._stored(self.size)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+
+class JSONStream:
+    """
+    Minimal pull parser for walking into a large JSON document as it
+    arrives, decoding only the values asked for. Containers are entered
+    with enter_array()/enter_object() and walked with next_item()/next_key();
+    value() decodes the next value in full.
+
+        stream = JSONStream(response.iter_content(65536))
+        stream.enter_array()
+        while stream.next_item():
+            handle(stream.value())
+    """
+
+    COMPACT_AT = 1 << 16
+
+    def __init__(self, chunks: Iterable):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the input is exhausted."""
+        if self.eof:
+            return False
+        for chunk in self.chunks:
+            text = self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                if self.pos >= self.COMPACT_AT:
+                    self.buf, self.pos = self.buf[self.pos:], 0
+                self.buf += text
+                return True
+        self.eof = True
+        self.buf += self.utf8.decode(b"", final=True)
+        return False
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of JSON input")
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode and return the next complete value."""
+        self._peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated number.
+            if end < len(self.buf) or not self._fill():
+                self.pos = end
+                return obj
+
+    def enter_array(self):
+        self._expect("[")
+
+    def enter_object(self):
+        self._expect("{")
+
+    def next_item(self) -> bool:
+        """Move to the next array item; False (and leave the array) at ']'."""
+        char = self._peek()
+        if char == "]":
+            self.pos += 1
+            return False
+        if char == ",":
+            self.pos += 1
+        return True
+
+    def next_key(self):
+        """Read the next object key (positioned at its value); None at '}'."""
+        char = self._peek()
+        if char == "}":
+            self.pos += 1
+            return None
+        if char == ",":
+            self.pos += 1
+        key = self.value()
+        self._expect(":")
+        return key
+
+    def find_key(self, name: str) -> bool:
+        """Skip entries of the current object until key `name`; False if absent."""
+        while True:
+            key = self.next_key()
+            if key is None:
+                return False
+            if key == name:
+                return True
+            self.value()
+
+    def drain(self):
+        """Read (and drop) the rest of the input, e.g. so a tee sees all of it."""
+        for _ in self.chunks:
+            pass
+        self.eof = True
+
+    def items(self) -> Iterator:
+        """Yield each item of the array starting at the current position."""
+        self.enter_array()
+        while self.next_item():
+            yield self.value()
@@ -0,0 +1,205 @@
+import json
+import math
+import os
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+# Latency histogram bucket bounds, in seconds.
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> list:
+        """[(upper bound, observations <= bound)], ending with +Inf."""
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float("inf"), self.count))
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {("+Inf" if bound == float("inf") else bound): n for bound, n in self.cumulative()},
+        }
+
+
+class Metrics:
+    """
+    Counters, per-stage wall time and per-stage latency histograms for one
+    run of a pipeline of generators.
+
+    Stages nest (an insert pulling from a parse pulling from a fetch), so
+    time is charged exclusively: whichever stage is innermost at the moment
+    gets the clock, and a stage's total never includes its upstream's work.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = defaultdict(float)  # (name, ((label, value), ...)) -> value
+        self.stage_seconds = defaultdict(float)
+        self.histograms = {}
+        self.started = time.time()
+        self._stack = []
+        self._mark = time.perf_counter()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        self.counters[(name, tuple(sorted(labels.items())))] += amount
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def _charge(self):
+        now = time.perf_counter()
+        if self._stack:
+            self.stage_seconds[self._stack[-1]] += now - self._mark
+        self._mark = now
+
+    @contextmanager
+    def stage(self, name: str, observe: bool = True):
+        """
+        Charge the time spent in the block to stage `name` (minus any nested
+        stages) and, with `observe`, record it as one latency observation.
+        """
+        before = self.stage_seconds[name]
+        self._charge()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._stack.pop()
+            if observe:
+                self.observe(name, self.stage_seconds[name] - before)
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Yield from `iterable`, charging the time spent producing each item
+        to stage `name` and observing it as that item's latency.
+        """
+        items = iter(iterable)
+        while True:
+            with self.stage(name, observe=False):
+                before = self.stage_seconds[name]
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            self.observe(name, self.stage_seconds[name] - before)
+            yield item
+
+    def snapshot(self) -> dict:
+        counters = []
+        for (name, labels), value in sorted(self.counters.items()):
+            counters.append({"name": name, "labels": dict(labels), "value": value})
+        return {
+            "started": self.started,
+            "duration_seconds": time.time() - self.started,
+            "counters": counters,
+            "stage_seconds": dict(self.stage_seconds),
+            "latency": {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+        }
+
+
+class JSONLogSink:
+    """Append each run's metrics as one JSON line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, metrics: Metrics):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(metrics.snapshot()) + "\n")
+
+
+class PrometheusFileSink:
+    """
+    Write the last run's metrics in Prometheus text format, replacing the
+    file atomically (for node_exporter's textfile collector).
+
+    Counters are exported as gauges: each file holds one run's totals,
+    which start from zero every run, so a Prometheus counter built from
+    them would look like it reset on every scrape of a new run.
+    """
+
+    def __init__(self, path: str, prefix: str = "getcoditer_ingest"):
+        self.path = path
+        self.prefix = prefix
+
+    @staticmethod
+    def _labels(labels) -> str:
+        if not labels:
+            return ""
+        pairs = []
+        for key, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{key}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+    @staticmethod
+    def _value(value) -> str:
+        """Full precision: integral values as ints, others as repr(float)."""
+        value = float(value)
+        if value.is_integer():
+            return str(int(value))
+        return repr(value) if math.isfinite(value) else {"inf": "+Inf", "-inf": "-Inf"}.get(repr(value), "NaN")
+
+    def render(self, metrics: Metrics) -> str:
+        p = self.prefix
+        lines = []
+        by_name = defaultdict(list)
+        for (name, labels), value in sorted(metrics.counters.items()):
+            by_name[name].append((labels, value))
+        for name, samples in by_name.items():
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.extend(f"{p}_{name}{self._labels(labels)} {self._value(value)}" for labels, value in samples)
+
+        lines.append(f"# TYPE {p}_stage_seconds gauge")
+        for stage, seconds in sorted(metrics.stage_seconds.items()):
+            lines.append(f'{p}_stage_seconds{{stage="{stage}"}} {seconds:.6f}')
+
+        lines.append(f"# TYPE {p}_stage_latency_seconds histogram")
+        for stage, histogram in sorted(metrics.histograms.items()):
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{p}_stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{p}_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'{p}_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        lines.append(f"# TYPE {p}_last_run_timestamp_seconds gauge")
+        lines.append(f"{p}_last_run_timestamp_seconds {metrics.started:.0f}")
+        lines.append(f"# TYPE {p}_last_run_duration_seconds gauge")
+        lines.append(f"{p}_last_run_duration_seconds {time.time() - metrics.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, metrics: Metrics):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.render(metrics))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
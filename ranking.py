@@ -0,0 +1,165 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+from candidate import Candidate
+from candidate_index import CandidateIndex
+from db_operation import SQLiteHandler
+from gazetteer import location_key
+
+
+class CandidateRanker:
+    """
+    Ranks candidates by how well they fit a search instead of filtering
+    them in or out. Each candidate's match score (0..1) is a weighted sum of:
+
+      tech        overlap with the requested techs, rarer techs counting more
+      experience  closeness to the requested years (under-qualified hurts more)
+      location    1 for a requested location, 0.5 if willing to relocate
+      score       the comment's Reddit score, log-scaled
+
+    Candidates are visited in tiers (same number of matched techs, same
+    location match) from the best possible score down, and kept in a
+    bounded heap. Once the heap is full and its worst entry beats the best
+    score the next tier could reach, the rest of the pool is never looked at.
+    """
+
+    WEIGHTS = {"tech": 0.55, "experience": 0.2, "location": 0.15, "score": 0.1}
+    YOE_SPAN = 5.0  # years off target at which the experience term reaches 0
+    RELOCATE = 0.5  # location term for candidates willing to relocate
+
+    def __init__(self, index: CandidateIndex, weights: Optional[Dict[str, float]] = None):
+        self.index = index
+        self.weights = {**self.WEIGHTS, **(weights or {})}
+
+    def rank(
+        self,
+        techs: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        yoe: Optional[float] = None,
+        page: int = 0,
+        page_size: int = 10
+    ) -> List[Tuple[float, int]]:
+        """
+        Return one page of (match_score, candidate_id), best first.
+        With techs given, candidates matching none of them are left out;
+        a None/empty yoe or locations means no preference.
+        """
+        with self.index.lock:
+            self.index._refresh()
+            return self._rank(techs, locations, yoe, page, page_size)
+
+    def rank_candidates(self, techs=None, locations=None, yoe: Optional[float] = None,
+                        page: int = 0, page_size: int = 10, db: SQLiteHandler = None) -> List[Candidate]:
+        """
+        Like rank(), but returns the Candidates with match_score set,
+        fetched through `db` when given, else the index's own handler.
+        """
+        ranked = self.rank(techs, locations, yoe, page, page_size)
+        db = db or self.index.db
+        candidates = db.get_by_ids([candidate_id for _, candidate_id in ranked])
+        for (match_score, _), candidate in zip(ranked, candidates):
+            candidate.match_score = round(match_score, 4)
+        return candidates
+
+    def _rank(self, techs, locations, yoe, page: int, page_size: int) -> List[Tuple[float, int]]:
+        index = self.index
+        w = self.weights
+        keep = (page + 1) * page_size
+        if keep <= 0 or not index.all_bits:
+            return []
+
+        # Rarer techs are more telling: weight each by its inverse frequency.
+        total = len(index.attributes)
+        tech_bits = []
+        for tech in dict.fromkeys(t.lower() for t in techs or []):
+            bits = index.tech_bits.get(tech, 0)
+            tech_bits.append((math.log(1 + total / (1 + bin(bits).count("1"))), bits))
+        tech_bits.sort(key=lambda item: item[0], reverse=True)
+        tech_total = sum(weight for weight, _ in tech_bits)
+        # Techs nobody lists still count against every candidate, but can't raise a bound.
+        reachable = [weight for weight, bits in tech_bits if bits]
+
+        if locations:
+            wanted = 0
+            for loc in locations:
+                wanted |= index.location_bits.get(location_key(loc), 0)
+            relocating = index.relocate_bits & ~wanted
+            location_tiers = [(1.0, wanted), (self.RELOCATE, relocating), (0.0, ~(wanted | relocating))]
+        else:
+            location_tiers = [(1.0, -1)]
+
+        # Upper bound of each tier's score; experience and score terms are at most 1.
+        tiers = []
+        for matched, bits in self._count_tiers(tech_bits, index.all_bits):
+            tech_bound = sum(reachable[:matched]) / tech_total if tech_total else 1.0
+            for location_value, location_bits in location_tiers:
+                tier = bits & location_bits
+                if tier:
+                    bound = w["tech"] * tech_bound + w["location"] * location_value + w["experience"] + w["score"]
+                    tiers.append((bound, location_value, tier))
+        tiers.sort(key=lambda tier: tier[0], reverse=True)
+
+        score_scale = math.log1p(index.max_score) if index.max_score > 0 else 1.0
+        heap = []
+        for bound, location_value, tier in tiers:
+            if len(heap) == keep and heap[0][0] >= bound:
+                break
+            base = w["location"] * location_value
+            for candidate_id in index.bits_to_ids(tier):
+                bit = 1 << candidate_id
+                experience, score = index.attributes[candidate_id]
+                tech = sum(weight for weight, bits in tech_bits if bits & bit) / tech_total if tech_total else 1.0
+                match_score = (
+                    base
+                    + w["tech"] * tech
+                    + w["experience"] * self._experience_term(experience, yoe)
+                    + w["score"] * (math.log1p(score) / score_scale if score > 0 else 0.0)
+                )
+                entry = (match_score, candidate_id)
+                if len(heap) < keep:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+        ranked = sorted(heap, reverse=True)
+        return ranked[page * page_size:keep]
+
+    def _experience_term(self, experience: Optional[float], yoe: Optional[float]) -> float:
+        if not yoe:
+            return 1.0
+        if experience is None:
+            return 0.0
+        gap = yoe - experience if experience < yoe else (experience - yoe) / 2
+        return max(0.0, 1.0 - gap / self.YOE_SPAN)
+
+    @staticmethod
+    def _count_tiers(tech_bits: list, pool: int):
+        """
+        Yield (matched, bitset) from the most requested techs matched down
+        to one (or the whole pool when no techs were requested). Counts are
+        kept bit-sliced, one bitset per binary digit, so splitting the pool
+        by count is a few big-int operations per tech.
+        """
+        if not tech_bits:
+            yield 0, pool
+            return
+
+        planes = []
+        for _, bits in tech_bits:
+            carry = bits
+            for i, plane in enumerate(planes):
+                planes[i], carry = plane ^ carry, plane & carry
+            if carry:
+                planes.append(carry)
+
+        for matched in range(len(tech_bits), 0, -1):
+            if matched.bit_length() > len(planes):
+                continue  # nobody reached a count this high
+            bits = pool
+            for i, plane in enumerate(planes):
+                bits &= plane if matched >> i & 1 else ~plane
+                if not bits:
+                    break
+            if bits:
+                yield matched, bits
@@ -1,6 +1,34 @@
-import requests
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import ResponseCache
+from json_stream import JSONStream
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
 
 class RedditScraper:
     BASE_URL = "https://www.reddit.com"
@@ -8,52 +36,142 @@ class RedditScraper:
         "User-Agent": "Mozilla/5.0 (RedditScraper/1.0)"
     }
 
-    def __init__(self, timeout=10):
+    MORECHILDREN_BATCH = 100  # max ids /api/morechildren accepts per call
+    STREAM_CHUNK = 64 * 1024
+
+    def __init__(self, timeout=10, base_url=None, max_workers=4, rate_limit=2.0,
+                 cache: ResponseCache | None = None, offline=False, auto_search=True):
+        """
+        max_workers bounds concurrent /api/morechildren requests and
+        rate_limit caps them at that many requests per second (None for
+        no cap). base_url points the scraper at another host, e.g. a local
+        fake Reddit server.
+
+        Responses go through `cache` (an on-disk ResponseCache by default;
+        pass False to disable). Stale entries are revalidated with
+        If-None-Match / If-Modified-Since. With offline=True, cached
+        responses are served regardless of age and nothing hits the network.
+
+        The current megathread is only looked up (one search request) the
+        first time self.permalink is needed, i.e. by fetch_post() without a
+        permalink; auto_search=False turns that off entirely.
+        """
         self.timeout = timeout
-        self.permalink = self.search_megathread()  # auto-run
+        self.base_url = base_url or self.BASE_URL
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.cache = ResponseCache() if cache is None else cache or None
+        self.offline = offline
+        self.errors = []  # request failures during the last fetch_post
+        # Running totals, for metrics: HTTP requests sent, body bytes received,
+        # fresh cache hits and 304 revalidations.
+        self.stats = {"requests": 0, "bytes": 0, "cache_hits": 0, "not_modified": 0}
+        self.stats_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.auto_search = auto_search
+        self._permalink = None
+        self._searched = False
+
+    @property
+    def permalink(self) -> str | None:
+        """The current month's megathread, searched for on first use."""
+        if self._permalink is None and self.auto_search and not self._searched:
+            self._searched = True
+            self._permalink = self.search_megathread()
+        return self._permalink
+
+    @permalink.setter
+    def permalink(self, permalink: str | None):
+        self._permalink = permalink
 
     def search_megathread(self, subreddit="developersIndia", query="Who's looking for work") -> str | None:
         """Search subreddit for current month's megathread post and return permalink"""
         month_year = datetime.now().strftime("%B %Y").lower()
-        url = f"{self.BASE_URL}/r/{subreddit}/search.json"
+        found = self.find_megathreads([month_year], subreddit, query, limit=15, max_pages=1)
+        if month_year in found:
+            return found[month_year]["permalink"]
+
+        print("❌ No matching megathread found.")
+        return None
+
+    def find_megathreads(self, months, subreddit="developersIndia", query="Who's looking for work",
+                         limit=100, max_pages=10) -> dict:
+        """
+        Page through subreddit search results (newest first) looking for the
+        monthly megathread of each month in `months` ("june 2025" style,
+        lowercase). Returns {month: post_data}; stops early once every month
+        is found or results run out.
+        """
+        wanted = set(months)
+        found = {}
+        url = f"{self.base_url}/r/{subreddit}/search.json"
         params = {
             "q": query,
             "restrict_sr": "on",
             "sort": "new",
-            "limit": 15
+            "limit": limit
         }
 
-        try:
-            res = requests.get(url, headers=self.HEADERS, params=params, timeout=self.timeout)
-            res.raise_for_status()
-            data = res.json()
-        except Exception as e:
-            print(f"Error searching subreddit: {e}")
-            return None
+        for _ in range(max_pages):
+            try:
+                data = self._get_json(url, params)
+            except Exception as e:
+                print(f"Error searching subreddit: {e}")
+                break
 
-        for post in data.get("data", {}).get("children", []):
-            title = post["data"].get("title", "").lower()
-            if "monthly megathread" in title and month_year in title:
-                print("✅ Found:", title)
-                return post["data"]["permalink"]
+            for post in data.get("data", {}).get("children", []):
+                title = post["data"].get("title", "").lower()
+                if "monthly megathread" not in title:
+                    continue
+                for month in wanted - found.keys():
+                    if month in title:
+                        print("✅ Found:", title)
+                        found[month] = post["data"]
 
-        print("❌ No matching megathread found.")
+            after = data.get("data", {}).get("after")
+            if not after or wanted <= found.keys():
+                break
+            params = {**params, "after": after}
+
+        return found
+
+    @staticmethod
+    def link_id_from_permalink(permalink: str) -> str | None:
+        """'/r/sub/comments/1l0gai1/slug/' -> 't3_1l0gai1'"""
+        parts = [part for part in permalink.split("/") if part]
+        if "comments" in parts and parts.index("comments") + 1 < len(parts):
+            return f"t3_{parts[parts.index('comments') + 1]}"
         return None
 
-    def fetch_post(self, permalink: str = None) -> dict | None:
-        """Fetch post and top-level comments"""
+    def fetch_post(self, permalink: str = None, skip_ids: set = None, stream: bool = False) -> dict | None:
+        """
+        Fetch post and all top-level comments, expanding "more" stubs.
+        Comment ids in skip_ids are not requested from /api/morechildren
+        (already-ingested comments, for incremental runs).
+
+        With stream=True, "comments" is a generator fed straight from the
+        response body as it downloads, so memory stays flat however large
+        the thread is. The thread body is still cached (written to disk as it
+        streams) and revalidated with a conditional request like any other.
+        Failed requests are recorded in self.errors either way.
+        """
         if permalink is None:
             permalink = self.permalink
         if not permalink:
             print("No permalink found.")
             return None
 
-        full_url = f"{self.BASE_URL}{permalink}.json"
+        self.errors = []
+        full_url = f"{self.base_url}{permalink}.json"
+        if stream:
+            return self._fetch_post_stream(full_url, skip_ids)
 
         try:
-            res = requests.get(full_url, headers=self.HEADERS, timeout=self.timeout)
-            res.raise_for_status()
-            data = res.json()
+            data = self._get_json(full_url)
         except Exception as e:
             print(f"Error fetching Reddit post: {e}")
             return None
@@ -66,28 +184,242 @@ class RedditScraper:
         title = post_data.get("title", "[no title]")
         body = post_data.get("selftext", "")
         comments_data = data[1]["data"]["children"]
-        comments = self._extract_comments(comments_data)
+        more_ids = []
+        comments = self._extract_comments(comments_data, more_ids)
+        link_id = post_data.get("name") or f"t3_{post_data.get('id')}"
+        if skip_ids:
+            more_ids = [comment_id for comment_id in more_ids if comment_id not in skip_ids]
+        if more_ids:
+            comments.extend(self._fetch_more_comments(link_id, more_ids))
 
         return {
+            "link_id": link_id,
             "title": title,
             "body": body,
             "comments": comments
         }
 
-    def _extract_comments(self, children: list) -> list:
+    def _fetch_post_stream(self, full_url: str, skip_ids: set = None) -> dict | None:
+        close = None
+        try:
+            chunks, close = self._get_stream(full_url)
+            parser = JSONStream(chunks)
+            # [post_listing, {"data": {..., "children": [...]}}]
+            parser.enter_array()
+            parser.next_item()
+            post_data = parser.value()["data"]["children"][0]["data"]
+            parser.next_item()
+            parser.enter_object()
+            found = parser.find_key("data")
+            if found:
+                parser.enter_object()
+                found = parser.find_key("children")
+        except Exception as e:
+            if close:
+                close()
+            print(f"Error fetching Reddit post: {e}")
+            return None
+
+        if not found:
+            close()
+            print("Unexpected Reddit JSON structure")
+            return None
+
+        link_id = post_data.get("name") or f"t3_{post_data.get('id')}"
+        return {
+            "link_id": link_id,
+            "title": post_data.get("title", "[no title]"),
+            "body": post_data.get("selftext", ""),
+            "comments": self._stream_comments(close, parser, link_id, skip_ids)
+        }
+
+    def _stream_comments(self, close, parser: JSONStream, link_id: str, skip_ids: set = None):
+        more_ids = []
+        try:
+            for item in parser.items():
+                yield from self._extract_comments([item], more_ids)
+            parser.drain()  # the rest of the body, so it gets cached
+        except Exception as e:
+            print(f"Error streaming Reddit post: {e}")
+            self.errors.append(e)
+        finally:
+            close()
+
+        if skip_ids:
+            more_ids = [comment_id for comment_id in more_ids if comment_id not in skip_ids]
+        if more_ids:
+            yield from self._fetch_more_comments(link_id, more_ids)
+
+    def _get_stream(self, url: str):
+        """
+        _get_json for a document parsed as it downloads: returns (chunks,
+        close). Fresh cache hits and 304s replay the cached body; a new body
+        is written to the cache as it streams, and kept only once read to
+        the end.
+        """
+        key = entry = None
+        if self.cache:
+            key = self.cache.key(url)
+            entry = self.cache.get(key)
+            if entry and (self.offline or self.cache.is_fresh(entry)):
+                self._count("cache_hits")
+                return iter([entry["body"]]), lambda: None
+        if self.offline:
+            raise LookupError(f"{url} is not cached (offline mode)")
+
+        self._count("requests")
+        res = self.session.get(url, headers=self._conditional_headers(entry), timeout=self.timeout, stream=True)
+        if res.status_code == 304 and entry:
+            res.close()
+            self._count("not_modified")
+            self.cache.touch(key, entry)
+            return iter([entry["body"]]), lambda: None
+        try:
+            res.raise_for_status()
+        except Exception:
+            res.close()
+            raise
+
+        chunks = self._counted(res.iter_content(self.STREAM_CHUNK))
+        if not self.cache:
+            return chunks, res.close
+        chunks = self._teed(chunks, self.cache.writer(key, res.headers.get("ETag"), res.headers.get("Last-Modified")))
+
+        def close():
+            chunks.close()  # drops the cache entry unless it was read to the end
+            res.close()
+        return chunks, close
+
+    @staticmethod
+    def _teed(chunks, writer):
+        complete = False
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+            complete = True
+        finally:
+            if complete:
+                writer.commit()
+            else:
+                writer.discard()
+
+    @staticmethod
+    def _conditional_headers(entry: dict | None) -> dict:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _get_json(self, url: str, params: dict = None, rate_limited: bool = False):
+        """
+        GET a JSON document through the pooled session and the response cache.
+        Raises on HTTP errors, and on a cache miss when offline.
+        """
+        key = entry = None
+        if self.cache:
+            key = self.cache.key(url, params)
+            entry = self.cache.get(key)
+            if entry and (self.offline or self.cache.is_fresh(entry)):
+                self._count("cache_hits")
+                return json.loads(entry["body"])
+        if self.offline:
+            raise LookupError(f"{url} is not cached (offline mode)")
+
+        if rate_limited:
+            self.rate_limiter.wait()
+        self._count("requests")
+        res = self.session.get(url, params=params, headers=self._conditional_headers(entry), timeout=self.timeout)
+        if res.status_code == 304 and entry:
+            self._count("not_modified")
+            self.cache.touch(key, entry)
+            return json.loads(entry["body"])
+        res.raise_for_status()
+        self._count("bytes", len(res.content))
+
+        if self.cache:
+            self.cache.put(key, res.text, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+        return res.json()
+
+    def _extract_comments(self, children: list, more_ids: list = None, parent_id: str = None) -> list:
+        """
+        Keep usable t1 comments. Ids listed by "more" stubs are appended to
+        more_ids when given. With parent_id, only direct replies to it count
+        (morechildren returns a flat list that mixes in nested replies).
+        """
         comments = []
         for item in children:
+            comment = item.get("data", {})
+            if parent_id and comment.get("parent_id") != parent_id:
+                continue
+            if item.get("kind") == "more":
+                if more_ids is not None:
+                    more_ids.extend(comment.get("children", []))
+                continue
             if item.get("kind") != "t1":
                 continue
-            comment = item.get("data", {})
             if comment.get("body") and comment.get("author") != "[deleted]":
                 comments.append({
+                    "id": comment.get("id"),
+                    "link_id": comment.get("link_id"),
                     "author": comment.get("author"),
                     "score": comment.get("score", 0),
+                    "created_utc": comment.get("created_utc", 0.0),
+                    "edited": float(comment.get("edited") or 0.0),
                     "body": comment.get("body")
                 })
         return comments
 
+    def _count(self, stat: str, amount: int = 1):
+        with self.stats_lock:
+            self.stats[stat] += amount
+
+    def _counted(self, chunks):
+        for chunk in chunks:
+            self._count("bytes", len(chunk))
+            yield chunk
+
+    def _fetch_more_comments(self, link_id: str, more_ids: list):
+        """
+        Expand "more" stubs through /api/morechildren, MORECHILDREN_BATCH ids
+        per request on a pool of max_workers threads. Stubs found in the
+        responses are expanded in the next round. Yields comments in stub
+        order, keeping at most 2 * max_workers responses in flight.
+        """
+        pending = list(more_ids)
+        window = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending:
+                batches = [pending[i:i + self.MORECHILDREN_BATCH]
+                           for i in range(0, len(pending), self.MORECHILDREN_BATCH)]
+                pending = []
+                for start in range(0, len(batches), window):
+                    round_batches = batches[start:start + window]
+                    for things in pool.map(lambda ids: self._fetch_morechildren(link_id, ids), round_batches):
+                        yield from self._extract_comments(things, pending, parent_id=link_id)
+
+    def _fetch_morechildren(self, link_id: str, ids: list) -> list:
+        url = f"{self.base_url}/api/morechildren.json"
+        params = {
+            "api_type": "json",
+            "link_id": link_id,
+            "children": ",".join(ids),
+            "limit_children": "false",
+            "raw_json": 1
+        }
+
+        try:
+            data = self._get_json(url, params, rate_limited=True)
+        except Exception as e:
+            print(f"Error fetching more comments: {e}")
+            self.errors.append(e)
+            return []
+
+        return data.get("json", {}).get("data", {}).get("things", [])
+
 
 # # === Usage ===
 # if __name__ == "__main__":
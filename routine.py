@@ -1,42 +1,195 @@
-from reddit_scrapper import RedditScraper
-from custom_parser import CommentParser
-from db_operation import SQLiteHandler  
+import math
+import sys
+from collections import deque
+from itertools import islice
+
+# Everything heavier (requests, the parser, SQLite, dedupe) is imported by
+# the functions that need it, so a no-op or --help run starts instantly.
 
 # --- CONFIG ---
 DB_PATH = "candidates.db"
 PERMALINK = "/r/developersIndia/comments/1l0gai1/whos_looking_for_work_monthly_megathread_june_2025/"
+INSERT_BATCH = 1000
+
+def usable_candidates(parser, comments, workers=None, metrics=None, rejected=None):
+    """
+    Serialize comments and yield only the ones worth storing. Comments
+    skipped along the way are appended to `rejected` as (comment, reason).
+    """
+    from experience import parse_experience
+
+    # iter_serialize yields one result per comment, in input order.
+    in_flight = deque()
+
+    def tracked():
+        for comment in comments:
+            in_flight.append(comment)
+            yield comment
+
+    for data in parser.iter_serialize(tracked(), workers=workers, return_exceptions=True):
+        comment = in_flight.popleft()
+        if isinstance(data, Exception):
+            print(f"⚠️ Skipped one comment due to error: {data}")
+            reason = "parse_error"
+        elif not data.get("blurb"):
+            reason = "no_blurb"  # skip poor data
+        elif not data.get("tech_stack"):
+            reason = "no_tech_stack"
+        else:
+            if metrics and data.get("experience") and not parse_experience(data["experience"]).confidence:
+                metrics.inc("experience_unparsed")  # stored as 0 years; worth a grammar fix
+            yield data
+            continue
+        if metrics:
+            metrics.inc("comments_skipped", reason=reason)
+        if rejected is not None:
+            rejected.append((comment, reason))
+
+def comment_version(comment: dict) -> float:
+    """Latest Reddit timestamp for a comment: its edit time, else creation time."""
+    return max(comment.get("created_utc") or 0.0, comment.get("edited") or 0.0)
+
+def resume_point(high_water: float, rejected: list) -> float:
+    """
+    The high-water mark to save after a run: kept just below the oldest
+    comment that failed to parse, so the next run retries it.
+    """
+    failed = [comment_version(comment) for comment, reason in rejected if reason == "parse_error"]
+    if failed:
+        return min(high_water, math.nextafter(min(failed), -math.inf))
+    return high_water
+
+def rejected_ids(rejected: list) -> list:
+    """(comment_id, reason) for comments rejected for their content, which need no retry."""
+    return [(comment["id"], reason) for comment, reason in rejected if reason != "parse_error" and comment.get("id")]
+
+def main(full: bool = False, sinks: list = (), profile_path: str = None,
+         permalink: str = PERMALINK, db_path: str = DB_PATH, base_url: str = None):
+    """
+    Ingest the megathread at `permalink` (None: search for the current
+    month's). Unless `full`, only comments created or edited after the
+    thread's high-water mark are parsed and upserted, and comments already
+    in the DB aren't re-requested from /api/morechildren.
 
-def main():
-    print("🔍 Fetching Reddit post...")
-    scraper = RedditScraper()
-    post = scraper.fetch_post(PERMALINK)
+    New candidates are matched against saved searches (alerts.py) and the
+    hits queued for the bot to send.
 
-    if not post:
-        print("❌ Could not retrieve Reddit post.")
-        return
+    Each run's counters and per-stage timings (fetch, filter, parse, insert, alerts)
+    go to every sink in `sinks` (metrics.JSONLogSink / PrometheusFileSink);
+    with `profile_path`, the run is also profiled with cProfile.
+    """
+    from metrics import Metrics
 
-    print(f"📝 Post Title: {post['title']}")
-    print(f"💬 Total Comments: {len(post['comments'])}\n")
+    metrics = Metrics()
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        ingest(metrics, full, permalink, db_path, base_url)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"🧪 Profile written to {profile_path}")
+        for sink in sinks:
+            sink.write(metrics)
 
-    parser = CommentParser()
-    db = SQLiteHandler(DB_PATH)
-    inserted_count = 0
+def ingest(metrics, full: bool = False, permalink: str = PERMALINK, db_path: str = DB_PATH, base_url: str = None):
+    from alerts import SubscriptionIndex, queue_alerts
+    from custom_parser import CommentParser
+    from db_operation import SQLiteHandler
+    from dedupe import Deduplicator
+    from reddit_scrapper import RedditScraper
 
-    for comment in post["comments"]:
-        try:
-            data = parser.serialize(comment)
-            if not data.get("blurb") or not data.get("tech_stack"):
-                continue  # skip poor data
+    db = SQLiteHandler(db_path)
+    scraper = RedditScraper(base_url=base_url)
+    try:
+        permalink = permalink or scraper.permalink  # searches for this month's thread
+        if not permalink:
+            metrics.inc("runs_failed")
+            return
 
-            db.insert_candidate(data)
-            inserted_count += 1
+        link_id = RedditScraper.link_id_from_permalink(permalink)
+        if full:
+            # Fields stored from earlier threads may parse differently now.
+            with db.conn:
+                print(f"🔁 Re-parsed the experience of {db.renormalize_experience()} stored candidates.")
+        high_water = 0.0 if full else db.get_high_water(link_id)
+        skip_ids = None if full else db.known_comment_ids(link_id)
 
-        except Exception as e:
-            print(f"⚠️ Skipped one comment due to error: {e}")
-        if(inserted_count>=5):
-            pass
-    db.close()
-    print(f"\n✅ Done. Inserted {inserted_count} structured candidates into '{DB_PATH}'.")
+        print("🔍 Fetching Reddit post...")
+        with metrics.stage("fetch"):
+            post = scraper.fetch_post(permalink, skip_ids=skip_ids, stream=True)
+
+        if not post:
+            print("❌ Could not retrieve Reddit post.")
+            metrics.inc("runs_failed")
+            return
+
+        print(f"📝 Post Title: {post['title']}")
+
+        seen = {"comments": 0, "changed": 0, "high_water": high_water}
+
+        def changed_comments(comments):
+            for comment in comments:
+                version = comment_version(comment)
+                seen["comments"] += 1
+                seen["high_water"] = max(seen["high_water"], version)
+                if version > high_water:
+                    seen["changed"] += 1
+                    yield comment
+
+        parser = CommentParser()
+        comments = metrics.timed_iter("fetch", post["comments"])
+        changed = metrics.timed_iter("filter", changed_comments(comments))
+        rejected = []
+        candidates = metrics.timed_iter("parse", usable_candidates(parser, changed, metrics=metrics, rejected=rejected))
+
+        dedupe = Deduplicator(db)
+        subscriptions = SubscriptionIndex.from_db(db)
+        counts = {"inserted": 0, "merged": 0, "alerts": 0}
+        with db.fast_ingest_mode():
+            while True:
+                batch = list(islice(candidates, INSERT_BATCH))
+                if not batch:
+                    break
+                new_ids = []
+                with metrics.stage("insert"):
+                    for key, value in dedupe.ingest(batch, batch_size=INSERT_BATCH, inserted_ids=new_ids).items():
+                        counts[key] += value
+                # Only brand-new people are alerted on, not reposts merged into known ones.
+                with metrics.stage("alerts"):
+                    counts["alerts"] += queue_alerts(db, new_ids, subscriptions)
+        print(f"💬 Total Comments: {seen['comments']} ({seen['changed']} new or edited since last run)")
+
+        # Remembered so "more" stubs hiding them aren't expanded again next run.
+        db.add_rejected_comments(post["link_id"], rejected_ids(rejected))
+        # A partial fetch must not advance the mark past comments it never saw.
+        if scraper.errors:
+            print(f"⚠️ {len(scraper.errors)} request(s) failed; high-water mark not advanced.")
+        elif seen["comments"]:
+            # A full run saw every comment, so its mark stands even when lower.
+            db.set_high_water(post["link_id"], resume_point(seen["high_water"], rejected), replace=full)
+        print(f"\n✅ Done. Stored {counts['inserted']} new candidates and merged {counts['merged']} repeat postings into '{db_path}'.")
+        if counts["alerts"]:
+            print(f"🔔 Queued {counts['alerts']} alert(s) for {len(subscriptions)} saved search(es).")
+
+        metrics.inc("comments_seen", seen["comments"])
+        metrics.inc("comments_changed", seen["changed"])
+        metrics.inc("rows_inserted", counts["inserted"])
+        metrics.inc("rows_merged", counts["merged"])
+        metrics.inc("alerts_queued", counts["alerts"])
+    finally:
+        db.close()
+        metrics.inc("request_errors", len(scraper.errors))
+        metrics.inc("http_requests", scraper.stats["requests"])
+        metrics.inc("bytes_downloaded", scraper.stats["bytes"])
+        metrics.inc("cache_hits", scraper.stats["cache_hits"])
+        metrics.inc("not_modified", scraper.stats["not_modified"])
 
 if __name__ == "__main__":
-    main()
+    from cli import main as cli_main
+
+    cli_main(["ingest", *sys.argv[1:]])